@@ -0,0 +1,70 @@
+"""Import-time benchmark guarding CLI startup latency
+
+Starts a fresh interpreter for each target, times it and fails (exit code 1)
+when the median exceeds the budget. Each project's own ``.venv`` interpreter is
+used when present, so run it after ``uv sync`` in the projects you care about:
+
+    python benchmarks/import_time.py --budget 1.0 --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, project directory, working directory relative to it, interpreter arguments)
+TARGETS = [
+    ("food-search --help", "food_search", "src", ["app.py", "--help"]),
+    ("import food_search chat modules", "food_search", "src",
+     ["-c", "import modules.llm_food_rag_search, modules.async_chat, modules.advance_search"]),
+    ("import chromadb_example", "chromadb_example", ".", ["-c", "import main"]),
+    ("import langchain_examples modules", "langchain_examples", "src",
+     ["-c", "import modules.embeddings_model, modules.llm_model"]),
+]
+
+
+def project_python(project_dir: str) -> str:
+    """Prefer the project's virtualenv interpreter, fall back to the current one"""
+    candidate = os.path.join(project_dir, ".venv", "bin", "python")
+    return candidate if os.path.exists(candidate) else sys.executable
+
+
+def time_target(python: str, cwd: str, args, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([python, *args], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum median seconds per target")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter starts per target")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for label, project, workdir, target_args in TARGETS:
+        project_dir = os.path.join(ROOT, project)
+        python = project_python(project_dir)
+        try:
+            seconds = time_target(python, os.path.join(project_dir, workdir), target_args, args.runs)
+        except subprocess.CalledProcessError as error:
+            failures += 1
+            message = error.stderr.decode(errors="replace").strip().splitlines()
+            print(f"ERROR {label}: {message[-1] if message else error}")
+            continue
+        status = "ok" if seconds <= args.budget else "SLOW"
+        failures += status != "ok"
+        print(f"{status:5} {seconds * 1000:8.1f} ms  {label}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""On-disk embedding cache, shared with food_search
+
+The implementation lives in food_search/src/modules/embedding_cache.py; this
+module only adapts its return type, since chromadb<1.0 validates embeddings
+as plain lists.
+"""
+import os
+import sys
+from typing import List
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from food_search.src.modules.embedding_cache import (  # noqa: E402
+    DEFAULT_CACHE_DIR, EmbeddingCache, text_hash, CachedEmbeddingFunction as _CachedEmbeddingFunction,
+)
+
+__all__ = ["DEFAULT_CACHE_DIR", "EmbeddingCache", "CachedEmbeddingFunction", "text_hash"]
+
+
+class CachedEmbeddingFunction(_CachedEmbeddingFunction):
+    """Embedding function wrapper that only encodes texts missing from the cache"""
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return [embedding.tolist() for embedding in super().__call__(input)]
@@ -1,19 +1,39 @@
 
-import chromadb
-from chromadb.utils import embedding_functions
+from parallel_embedding import ParallelEmbeddingFunction
 
-ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name="all-MiniLM-L6-v2"
-)
+_ef = None
+_client = None
+
+
+def get_embedding_function():
+    """Build the cached sentence transformer embedding function on first use"""
+    global _ef
+    if _ef is None:
+        from chromadb.utils import embedding_functions
+        from embedding_cache import CachedEmbeddingFunction
+
+        _ef = CachedEmbeddingFunction(
+            embedding_functions.SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2"),
+            model_name="all-MiniLM-L6-v2"
+        )
+    return _ef
+
+
+def get_client():
+    """Create the in-memory ChromaDB client on first use"""
+    global _client
+    if _client is None:
+        import chromadb
 
-client = chromadb.Client()
+        _client = chromadb.Client()
+    return _client
 
 
-def create_collection(collection_name): 
-    collection = client.create_collection(
+def create_collection(collection_name, embedding_function=None):
+    collection = get_client().create_collection(
         name=collection_name,
         metadata={"hnsw:space": "cosine"},
-        embedding_function=ef
+        embedding_function=embedding_function or get_embedding_function()
     )
     return collection
 
@@ -0,0 +1,25 @@
+"""Multi-process sentence transformer encoder, shared with food_search
+
+The implementation lives in food_search/src/modules/parallel_embedding.py;
+this module only returns plain lists, as chromadb<1.0 expects.
+"""
+import os
+import sys
+from typing import List
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from food_search.src.modules.parallel_embedding import (  # noqa: E402
+    DEFAULT_ENCODE_BATCH_SIZE, ParallelEmbeddingFunction as _ParallelEmbeddingFunction,
+)
+
+__all__ = ["DEFAULT_ENCODE_BATCH_SIZE", "ParallelEmbeddingFunction"]
+
+
+class ParallelEmbeddingFunction(_ParallelEmbeddingFunction):
+    """Encode documents with a pool of CPU worker processes, keeping input order"""
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return [embedding.tolist() for embedding in super().__call__(input)]
@@ -0,0 +1,88 @@
+"""Microbenchmark: docs/sec of the original preprocess_text against the batch pipeline
+
+    python benchmark_preprocess.py --docs 20000 --workers 4
+
+Uses the 20 newsgroups train split when it is in the local scikit-learn cache,
+otherwise a synthetic corpus of newsgroup-like posts. Outputs are checked to
+be identical before anything is timed.
+"""
+import argparse
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from preprocessing import preprocess_batch, preprocess_text
+
+
+def legacy_preprocess_text(text):
+    """The original implementation, kept as the baseline"""
+    text = re.sub(r'^From:.*\n?', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\S*@\S*\s?', '', text)
+    text = re.sub(r'[^a-zA-Z\s]', '', text)
+    text = text.lower()
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def synthetic_corpus(n_docs, seed=0):
+    rng = random.Random(seed)
+    words = ("space", "NASA", "launch", "orbit", "Python", "compiler", "baseball", "playoffs",
+             "graphics", "encryption", "Mars", "hockey", "windows", "driver", "the", "and", "of")
+    docs = []
+    for i in range(n_docs):
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(80, 400)))
+        docs.append(
+            f"From: user{i}@example.com (User {i})\nSubject: Re: question #{i}\n"
+            f"Organization: Example University\nLines: {rng.randint(5, 90)}\n\n"
+            f"In article <{i}@news.example.com> someone@example.org wrote:\n> {body[:200]}\n\n"
+            f"{body}, costs ${rng.randint(1, 999)}.99{' -- café résumé' if i % 20 == 0 else ''}\n"
+        )
+    return docs
+
+
+def load_corpus(n_docs):
+    try:
+        from sklearn.datasets import fetch_20newsgroups
+
+        data = fetch_20newsgroups(subset='train', download_if_missing=False).data
+        print(f"Corpus: 20 newsgroups train split ({len(data)} posts)")
+    except Exception:
+        data = synthetic_corpus(min(n_docs, 5000))
+        print(f"Corpus: {len(data)} synthetic newsgroup-style posts")
+    return (data * (n_docs // len(data) + 1))[:n_docs]
+
+
+def timed(label, func, docs, baseline=None):
+    started = time.perf_counter()
+    func(docs)
+    elapsed = time.perf_counter() - started
+    rate = len(docs) / elapsed
+    speedup = f"  ({rate / baseline:.2f}x)" if baseline else ""
+    print(f"{label:32} {rate:12,.0f} docs/sec{speedup}")
+    return rate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000, help="Number of documents to preprocess")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Process pool size")
+    args = parser.parse_args(argv)
+
+    docs = load_corpus(args.docs)
+    mismatches = sum(preprocess_text(doc) != legacy_preprocess_text(doc) for doc in docs)
+    if mismatches:
+        raise SystemExit(f"{mismatches} documents differ from the original preprocess_text")
+
+    baseline = timed("original (4x re.sub)", lambda d: [legacy_preprocess_text(doc) for doc in d], docs)
+    timed("precompiled + translate", preprocess_batch, docs, baseline)
+    if args.workers and args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            preprocess_batch(docs[:args.workers], executor)  # start the workers outside the timing
+            timed(f"process pool ({args.workers} workers)",
+                  lambda d: preprocess_batch(d, executor), docs, baseline)
+
+
+if __name__ == "__main__":
+    main()
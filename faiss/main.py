@@ -1,78 +1,276 @@
-import re
+import argparse
+import mmap
+import os
+import time
+import warnings
 import numpy as np
 import tensorflow_hub as hub
 import faiss
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from sklearn.datasets import fetch_20newsgroups
 
+from preprocessing import preprocess_batch, preprocess_text
 
+INDEX_FILE = "index.faiss"
+DOCUMENTS_FILE = "documents.bin"
+OFFSETS_FILE = "offsets.npy"
+DATASET_FILE = "dataset.txt"
+DEFAULT_INDEX_DIR = os.getenv("FAISS_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "index"))
 
-def load_newsgroups():
-    """Load 20 newsgroups dataset with retry logic"""
+
+DEFAULT_EMBED_BATCH_SIZE = 256
+
+SAMPLE_DATA = [
+    "From: user@example.com\nSubject: Space exploration\nNASA announced new missions to Mars.",
+    "From: dev@tech.com\nSubject: Programming tips\nPython is great for machine learning.",
+    "From: sports@news.com\nSubject: Baseball season\nThe playoffs are starting next week.",
+]
+
+
+def load_newsgroups(subset='train'):
+    """Load 20 newsgroups from the local scikit-learn cache, never from the network
+
+    Populate the cache once with ``fetch_20newsgroups()`` on a connected machine
+    (or point SCIKIT_LEARN_DATA at a copy).
+    """
     try:
-        return fetch_20newsgroups(subset='train')
+        return fetch_20newsgroups(subset=subset, download_if_missing=False)
     except Exception as e:
-        print(f"Failed to download dataset: {e}")
+        print(f"20 newsgroups not found in the local cache: {e}")
         print("Using sample data instead...")
         return None
 
-def preprocess_text(text):
-    # Remove email headers
-    text = re.sub(r'^From:.*\n?', '', text, flags=re.MULTILINE)
-    # Remove email addresses
-    text = re.sub(r'\S*@\S*\s?', '', text)
-    # Remove punctuations and numbers
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-    # Convert to lowercase
-    text = text.lower()
-    # Remove excess whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-def embed_text_func(texts, embed_model):
-    """Embed texts - expects a list of strings"""
+def embed_text_func(texts, embed_model, batch_size=None):
+    """Embed texts - expects a list of strings
+
+    With ``batch_size`` the texts are sent to the model in fixed-size chunks, so
+    peak memory does not grow with the number of texts.
+    """
     if isinstance(texts, str):
         texts = [texts]
-    return embed_model(texts).numpy()
+    if not batch_size or len(texts) <= batch_size:
+        return embed_model(texts).numpy()
+    return np.vstack([embed_model(texts[start:start + batch_size]).numpy()
+                      for start in range(0, len(texts), batch_size)])
+
 
-def search(query_text, preprocess_func,embed_text, k=5):
+def build_index_in_batches(documents, ids, embed_model, batch_size=DEFAULT_EMBED_BATCH_SIZE, executor=None):
+    """Preprocess, embed and add documents one fixed-size batch at a time, reporting throughput
+
+    Pass a process pool as ``executor`` to spread preprocessing over several cores.
+    """
+    index = None
+    started = time.perf_counter()
+    for start in range(0, len(documents), batch_size):
+        batch = preprocess_batch(documents[start:start + batch_size], executor)
+        vectors = np.ascontiguousarray(embed_text_func(batch, embed_model), dtype=np.float32)
+        if index is None:
+            index = faiss.IndexIDMap(faiss.IndexFlatL2(vectors.shape[1]))
+        index.add_with_ids(vectors, np.asarray(ids[start:start + batch_size], dtype=np.int64))
+
+        done = start + len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"   Indexed {done}/{len(documents)} documents ({done / elapsed:.1f} docs/sec)")
+
+    elapsed = time.perf_counter() - started
+    print(f"Indexed {len(documents)} documents in {elapsed:.1f}s ({len(documents) / max(elapsed, 1e-9):.1f} docs/sec)")
+    return index
+
+def search(index, query_text, preprocess_func, embed_text, k=5):
+    """Search an explicitly passed index; FaissSearcher wraps this with document lookup"""
     # Preprocess the query text
     preprocessed_query = preprocess_func(query_text)
     # Generate the query vector
     query_vector = embed_text([preprocessed_query])
     # Perform the search
-    distances, indices = index.search(query_vector.astype('float32'), k)
+    distances, indices = index.search(np.ascontiguousarray(query_vector, dtype=np.float32), k)
     return distances, indices
-    
-def main():
+
+
+class DocumentStore:
+    """Read-only documents addressed by id, backed by documents.bin and an offsets table
+
+    ``offsets.npy`` holds (id, offset, length) rows sorted by id. Both files are
+    memory-mapped, so worker processes share the page cache instead of each
+    holding a copy of the corpus.
+    """
+
+    def __init__(self, directory):
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode="r")
+        with open(os.path.join(directory, DOCUMENTS_FILE), "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(file.fileno()).st_size else b""
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def get(self, doc_id):
+        row = np.searchsorted(self.offsets[:, 0], doc_id)
+        if row >= len(self.offsets) or self.offsets[row, 0] != doc_id:
+            return None
+        _, offset, length = self.offsets[row]
+        return self._data[offset:offset + length].decode("utf-8")
+
+    def get_many(self, doc_ids):
+        return [self.get(doc_id) if doc_id != -1 else None for doc_id in doc_ids]
+
+
+def write_documents(directory, ids, documents):
+    """Write documents as concatenated UTF-8 plus an (id, offset, length) table sorted by id"""
+    table = np.zeros((len(ids), 3), dtype=np.int64)
+    offset = 0
+    with open(os.path.join(directory, DOCUMENTS_FILE), "wb") as file:
+        for row, (doc_id, document) in enumerate(zip(ids, documents)):
+            encoded = document.encode("utf-8")
+            file.write(encoded)
+            table[row] = (doc_id, offset, len(encoded))
+            offset += len(encoded)
+    np.save(os.path.join(directory, OFFSETS_FILE), table[np.argsort(table[:, 0], kind="stable")])
+
+
+def save_index(directory, index, ids, documents, dataset):
+    os.makedirs(directory, exist_ok=True)
+    # The index is written last; its presence marks a complete directory
+    if index_exists(directory):
+        os.remove(os.path.join(directory, INDEX_FILE))
+    write_documents(directory, ids, documents)
+    with open(os.path.join(directory, DATASET_FILE), "w", encoding="utf-8") as file:
+        file.write(dataset)
+    faiss.write_index(index, os.path.join(directory, INDEX_FILE))
+
+
+def index_exists(directory):
+    return os.path.exists(os.path.join(directory, INDEX_FILE))
+
+
+def index_dataset(directory):
+    """Name of the dataset a saved index was built from, None without a complete index"""
+    if not index_exists(directory):
+        return None
+    try:
+        with open(os.path.join(directory, DATASET_FILE), encoding="utf-8") as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def open_index(directory, use_mmap=True):
+    """Reopen a saved index and its document store
+
+    With ``use_mmap`` the vectors are memory-mapped read-only instead of being
+    copied into RAM (flat codes need faiss's IO_FLAG_MMAP_IFC, IVF lists
+    IO_FLAG_MMAP), so many processes can serve one multi-GB index.
+    """
+    flags = 0
+    if use_mmap:
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+            flags |= faiss.IO_FLAG_MMAP_IFC
+        else:
+            warnings.warn(
+                f"faiss {faiss.__version__} has no IO_FLAG_MMAP_IFC, so flat index vectors are read into RAM; "
+                "upgrade faiss-cpu to memory-map them",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+    index = faiss.read_index(os.path.join(directory, INDEX_FILE), flags)
+    return index, DocumentStore(directory)
+
+
+class FaissSearcher:
+    """Serve queries from one index, encoder and document store
+
+    ``search_many`` preprocesses and embeds all queries in one encoder call and
+    runs a single batched ``index.search``, which FAISS parallelizes over the
+    queries with OpenMP; ``num_threads`` caps the threads it uses
+    (``faiss.omp_set_num_threads``, process-wide).
+    """
+
+    def __init__(self, index, documents, embed_model, preprocess_func=preprocess_text,
+                 num_threads=None, embed_batch_size=DEFAULT_EMBED_BATCH_SIZE):
+        self.index = index
+        self.documents = documents
+        self.embed_model = embed_model
+        self.preprocess_func = preprocess_func
+        self.embed_batch_size = embed_batch_size
+        if num_threads:
+            faiss.omp_set_num_threads(num_threads)
+
+    @classmethod
+    def open(cls, directory, embed_model, use_mmap=True, **kwargs):
+        index, documents = open_index(directory, use_mmap=use_mmap)
+        return cls(index, documents, embed_model, **kwargs)
+
+    def embed(self, queries):
+        processed = [self.preprocess_func(query) for query in queries]
+        vectors = embed_text_func(processed, self.embed_model, batch_size=self.embed_batch_size)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def search_many(self, queries, k=5):
+        """Return, per query, a list of (id, distance, document) for the k nearest documents"""
+        if not queries:
+            return []
+        distances, ids = self.index.search(self.embed(queries), k)
+        results = []
+        for row_distances, row_ids in zip(distances, ids):
+            results.append([
+                (int(doc_id), float(distance), self.documents.get(doc_id))
+                for doc_id, distance in zip(row_ids, row_distances) if doc_id != -1
+            ])
+        return results
+
+    def search(self, query, k=5):
+        return self.search_many([query], k)[0]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="FAISS semantic search over newsgroup posts")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR,
+                        help="Directory holding the index and document store (FAISS_INDEX_DIR)")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed the documents even if an index exists")
+    parser.add_argument("--dataset", choices=["sample", "newsgroups"], default="sample",
+                        help="Index three sample posts or the 20 newsgroups train split from the local cache")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_EMBED_BATCH_SIZE,
+                        help="Documents embedded and added to the index per batch")
+    parser.add_argument("--preprocess-workers", type=int,
+                        help="Preprocess documents in a pool of this many processes")
+    parser.add_argument("--no-mmap", action="store_true", help="Load the index into RAM instead of memory-mapping it")
+    parser.add_argument("--threads", type=int, help="Number of OpenMP threads FAISS uses for search")
+    parser.add_argument("-k", type=int, default=3, help="Results per query")
+    parser.add_argument("queries", nargs="*", default=["Python programming tips"], help="Queries to search for")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     print("Hello from faiss!")
-    
-    # newsgroups_train = load_newsgroups()
-    data = [
-            "From: user@example.com\nSubject: Space exploration\nNASA announced new missions to Mars.",
-            "From: dev@tech.com\nSubject: Programming tips\nPython is great for machine learning.",
-            "From: sports@news.com\nSubject: Baseball season\nThe playoffs are starting next week.",
-        ]
-    
-    
-    processed_documents = [preprocess_text(doc) for doc in data]
+    args = parse_args(argv)
     
     embed = hub.load("https://tfhub.dev/google/universal-sentence-encoder/4")
-    X_use = np.vstack([embed_text_func(processed_documents, embed)])
-    dimension = X_use.shape[1]
-    index = faiss.IndexFlatL2(dimension)  # Creating a FAISS index
-    index.add(X_use)  # Adding the document vectors to the index
-    
-    preprocessed_query = preprocess_text("Python programming tips")
-    
-    # Test search
-    query_vector = embed_text_func([preprocessed_query], embed)
-    distances, indices = index.search(query_vector.astype('float32'), 3)
-    print(f"Search results indices: {indices[0]}")
-    print(f"Search distances: {distances[0]}")
-    
-    for i, idx in enumerate(indices[0]):
-        # Displaying the original (unprocessed) document corresponding to the search result
-        print(f"Rank {i+1}: (Distance: {distances[0][i]})\n{data[idx]}\n")    
+
+    built_from = index_dataset(args.index_dir)
+    if not args.rebuild and built_from not in (None, args.dataset):
+        print(f"Index in {args.index_dir} holds the {built_from} dataset, rebuilding it for {args.dataset}")
+    if args.rebuild or built_from != args.dataset:
+        dataset, data = "sample", SAMPLE_DATA
+        if args.dataset == "newsgroups":
+            newsgroups_train = load_newsgroups()
+            if newsgroups_train is not None:
+                dataset, data = "newsgroups", newsgroups_train.data
+        ids = np.arange(len(data), dtype=np.int64)
+        workers = args.preprocess_workers
+        with ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else nullcontext() as executor:
+            index = build_index_in_batches(data, ids, embed, batch_size=args.batch_size, executor=executor)
+        save_index(args.index_dir, index, ids, data, dataset)
+        print(f"Saved index of {len(data)} {dataset} documents to {args.index_dir}")
+
+    searcher = FaissSearcher.open(args.index_dir, embed, use_mmap=not args.no_mmap, num_threads=args.threads)
+    print(f"Opened index with {searcher.index.ntotal} vectors from {args.index_dir}")
+
+    for query, hits in zip(args.queries, searcher.search_many(args.queries, args.k)):
+        print(f"\nQuery: {query}")
+        for rank, (doc_id, distance, document) in enumerate(hits, 1):
+            # Displaying the original (unprocessed) document corresponding to the search result
+            print(f"Rank {rank}: id {doc_id} (Distance: {distance})\n{document}\n")
 
 if __name__ == "__main__":
     main()
@@ -1,16 +1,82 @@
+import argparse
+import asyncio
 
-from modules.create_chroma import initiate_food_collection
-from modules.llm_food_rag_search import start_chat
+from modules.ingest import DEFAULT_BATCH_SIZE
+from modules.parallel_embedding import DEFAULT_ENCODE_BATCH_SIZE
 
-def main():
-    collection = initiate_food_collection()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="RAG-powered food recommendation chatbot")
+    parser.add_argument(
+        "--persist-dir",
+        help="Store the food collection on disk and reuse it across restarts "
+             "(defaults to CHROMA_PERSIST_DIR, or FAISS_PERSIST_DIR with --backend faiss)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Number of dishes embedded and written per ingestion batch",
+    )
+    parser.add_argument(
+        "--embedding-workers",
+        type=int,
+        help="Encode documents with this many worker processes during ingestion",
+    )
+    parser.add_argument(
+        "--encode-batch-size",
+        type=int,
+        default=DEFAULT_ENCODE_BATCH_SIZE,
+        help="Sentences per encoder batch inside each embedding worker",
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help="Re-encode every document instead of reusing EMBEDDING_CACHE_DIR",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["chroma", "faiss"],
+        help="Vector store for the food collection (defaults to VECTOR_BACKEND, then chroma)",
+    )
+    parser.add_argument(
+        "--faiss-index",
+        choices=["flat", "ivf-flat", "ivf-pq", "hnsw"],
+        help="FAISS index type when --backend faiss (defaults to FAISS_INDEX_TYPE, then hnsw)",
+    )
+    parser.add_argument(
+        "--async-chat",
+        action="store_true",
+        help="Use the asyncio chat loop that streams the LLM answer token by token",
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Heavy dependencies (ChromaDB, the LLM SDK) are imported only once we know we need them
+    from modules.create_chroma import initiate_food_collection
+    from modules.llm_food_rag_search import start_chat
+
+    collection = initiate_food_collection(
+        persist_directory=args.persist_dir,
+        batch_size=args.batch_size,
+        embedding_workers=args.embedding_workers,
+        encode_batch_size=args.encode_batch_size,
+        use_embedding_cache=not args.no_embedding_cache,
+        backend=args.backend,
+        faiss_index_type=args.faiss_index
+    )
     # result = perform_similarity_search(collection, "find me a food that is a pasta")
-    # result = perform_filtered_similarity_search(collection, 
+    # result = perform_filtered_similarity_search(collection,
     # "find best pizza", cuisine_filter="Italian", max_calories=500)
     # interactive_food_chatbot(collection)
     # print(result)
     # interactive_advanced_search(collection)
-    start_chat(collection)
+    if args.async_chat:
+        from modules.async_chat import start_async_chat
+        asyncio.run(start_async_chat(collection))
+    else:
+        start_chat(collection)
 
 
 
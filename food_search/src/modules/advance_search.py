@@ -1,5 +1,5 @@
-from modules.search_food import perform_similarity_search
-from modules.search_food import perform_filtered_similarity_search
+from modules.query_engine import perform_similarity_search
+from modules.query_engine import perform_filtered_similarity_search
 from typing import List, Dict, Any, Optional
 
 def interactive_advanced_search(collection):
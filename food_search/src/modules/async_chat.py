@@ -0,0 +1,251 @@
+import asyncio
+import os
+import stat
+import sys
+import threading
+from typing import List, Dict, Any, Optional, Callable
+
+from modules.llm_client import async_request_slot, get_async_llm_client
+from modules.response_cache import response_cache, response_cache_key
+from modules.llm_food_rag_search import (
+    MAX_COMPARISON_QUERIES,
+    MODEL,
+    build_comparison_prompt,
+    build_rag_prompt,
+    comparison_query_prompt,
+    generate_fallback_response,
+    generate_simple_multi_comparison,
+    retrieve_for_comparison,
+    retrieve_for_query,
+    show_comparison_table,
+    show_help,
+    show_search_details,
+)
+
+
+def print_token(text: str) -> None:
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+async def read_input(func: Callable[..., Any], *args) -> Any:
+    """Await a blocking stdin read (``input`` and friends) without pinning shutdown
+
+    ``asyncio.to_thread`` runs on the default executor, which ``asyncio.run``
+    joins on exit, so Ctrl+C at a prompt hung until Enter was pressed. The read
+    runs on a daemon thread instead, which is simply abandoned on exit.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def read():
+        result, error = None, None
+        try:
+            result = func(*args)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(settle, result, error)
+        except RuntimeError:
+            pass  # the loop closed while waiting for input
+
+    threading.Thread(target=read, name="stdin-reader", daemon=True).start()
+    return await future
+
+
+class PipeLineReader:
+    """Read stdin lines through the event loop when stdin is a pipe or socket
+
+    A thread blocked in ``input()`` on a pipe holds the stdin buffer lock, and
+    interpreter shutdown aborts on it ("_enter_buffered_busy") when Ctrl+C
+    ends the chat. Waiting for the descriptor with ``loop.add_reader`` keeps
+    the pending read cancellable instead.
+    """
+
+    def __init__(self, fd: int, encoding: str):
+        self.fd = fd
+        self.encoding = encoding
+        self._buffer = b""
+        self._eof = False
+
+    async def readline(self) -> str:
+        """Return the next line without its newline, raising EOFError at end of input like ``input``"""
+        while b"\n" not in self._buffer and not self._eof:
+            await self._wait_readable()
+            data = os.read(self.fd, 1 << 16)
+            self._buffer += data
+            self._eof = not data
+        if not self._buffer:
+            raise EOFError
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line.decode(self.encoding, errors="replace")
+
+    async def _wait_readable(self) -> None:
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        loop.add_reader(self.fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(self.fd)
+
+
+_pipe_reader: Optional[PipeLineReader] = None
+
+
+def stdin_pipe_reader() -> Optional[PipeLineReader]:
+    """Return the shared reader for a piped stdin, or None when stdin is a terminal or a file"""
+    global _pipe_reader
+    if _pipe_reader is None and os.name == "posix":
+        try:
+            fd = sys.stdin.fileno()
+            mode = os.fstat(fd).st_mode
+        except (AttributeError, OSError, ValueError):
+            return None
+        if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode):
+            _pipe_reader = PipeLineReader(fd, sys.stdin.encoding or "utf-8")
+    return _pipe_reader
+
+
+async def read_line(prompt: str = "") -> str:
+    """Async ``input``: piped stdin is read by the event loop, a terminal on a daemon thread"""
+    reader = stdin_pipe_reader()
+    if reader is None:
+        return await read_input(input, prompt)
+    print_token(prompt)
+    return await reader.readline()
+
+
+async def read_comparison_queries_async(max_queries: int = MAX_COMPARISON_QUERIES) -> List[str]:
+    """Prompt for two or more food queries; a blank line ends the list"""
+    queries = []
+    while len(queries) < max_queries:
+        query = (await read_line(comparison_query_prompt(len(queries)))).strip()
+        if not query:
+            if len(queries) >= 2:
+                break
+            continue
+        queries.append(query)
+    return queries
+
+
+async def stream_response(prompt: str, on_text: Callable[[str], None] = print_token) -> str:
+    """Stream a Claude response, handing each text delta to on_text as it arrives"""
+    parts = []
+    async with async_request_slot():
+        async with get_async_llm_client().messages.stream(
+            model=MODEL,
+            max_tokens=1000,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                parts.append(text)
+                on_text(text)
+    return "".join(parts)
+
+
+async def handle_rag_query_async(collection, query: str) -> Optional[str]:
+    """Retrieve off the event loop, then stream the RAG answer token by token"""
+    print(f"\n🔍 Searching vector database for: '{query}'...")
+    search_results = await asyncio.to_thread(retrieve_for_query, collection, query, 3)
+
+    if not search_results:
+        print("🤖 Bot: I couldn't find any food items matching your request.")
+        print("      Try describing what you're in the mood for with different words!")
+        return None
+
+    print(f"✅ Found {len(search_results)} relevant matches")
+    print("\n🤖 Bot: ", end="", flush=True)
+    try:
+        query_embedding, food_ids, filters = await asyncio.to_thread(response_cache_key, query, search_results)
+        response = response_cache.lookup(query_embedding, food_ids, MODEL, filters)
+        if response is not None:
+            print(response)
+        else:
+            response = await stream_response(build_rag_prompt(query, search_results))
+            response_cache.store(query_embedding, food_ids, MODEL, response, filters)
+            print()
+    except Exception as e:
+        print(f"\n❌ LLM Error: {e}")
+        response = generate_fallback_response(query, search_results)
+        print(f"\n🤖 Bot: {response}")
+
+    show_search_details(search_results)
+    return response
+
+
+async def handle_comparison_mode_async(collection) -> Optional[str]:
+    """Compare two or more queries, streaming the analysis as soon as all contexts are ready"""
+    print("\n🔄 ENHANCED COMPARISON MODE")
+    print("   Powered by AI Analysis")
+    print("-" * 35)
+
+    queries = await read_comparison_queries_async()
+    if len(queries) < 2:
+        print("❌ Please enter at least two queries for comparison")
+        return None
+
+    print(f"\n🔍 Analyzing {' vs '.join(repr(q) for q in queries)} with AI...")
+    results_list = await asyncio.to_thread(retrieve_for_comparison, collection, queries, 3)
+
+    print("\n🤖 AI Analysis: ", end="", flush=True)
+    try:
+        response = await stream_response(build_comparison_prompt(queries, results_list))
+        print()
+    except Exception:
+        response = generate_simple_multi_comparison(queries, results_list)
+        print(response)
+
+    show_comparison_table(queries, results_list)
+    return response
+
+
+async def start_async_chat(collection):
+    """Asyncio RAG chatbot that streams Claude's answer as it is generated"""
+    print("\n" + "="*70)
+    print("🤖 RAG FOOD RECOMMENDATION CHATBOT (streaming)")
+    print("   Powered by Anthropic Claude & ChromaDB")
+    print("="*70)
+    print("💬 Ask me about food recommendations using natural language!")
+    print("\nCommands:")
+    print("  • 'help' - Show detailed help menu")
+    print("  • 'compare' - Compare recommendations for two or more queries")
+    print("  • 'quit' - Exit the chatbot")
+    print("-" * 70)
+
+    while True:
+        try:
+            user_input = (await read_line("\n👤 You: ")).strip()
+
+            if not user_input:
+                print("🤖 Bot: Please tell me what kind of food you're looking for!")
+                continue
+
+            if user_input.lower() in ['quit', 'exit', 'q']:
+                print("\n🤖 Bot: Thank you for using the Enhanced RAG Food Chatbot!")
+                print("      Hope you found some delicious recommendations! 👋")
+                break
+
+            elif user_input.lower() in ['help', 'h']:
+                show_help()
+
+            elif user_input.lower() in ['compare']:
+                await handle_comparison_mode_async(collection)
+
+            else:
+                await handle_rag_query_async(collection, user_input)
+
+        except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
+            # asyncio.run turns Ctrl+C into cancelling this task
+            print("\n\n🤖 Bot: Goodbye! Hope you find something delicious! 👋")
+            break
+        except Exception as e:
+            print(f"❌ Bot: Sorry, I encountered an error: {e}")
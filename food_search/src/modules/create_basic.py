@@ -1,34 +1,2 @@
-from typing import List, Dict, Any, Optional
-
-def perform_similarity_search(collection, query: str, n_results: int = 5) -> List[Dict]:
-    """Perform similarity search and return formatted results"""
-    try:
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
-        
-        if not results or not results['ids'] or len(results['ids'][0]) == 0:
-            return []
-        
-        formatted_results = []
-        for i in range(len(results['ids'][0])):
-            # Calculate similarity score (1 - distance)
-            similarity_score = 1 - results['distances'][0][i]
-            
-            result = {
-                'food_id': results['ids'][0][i],
-                'food_name': results['metadatas'][0][i]['name'],
-                'food_description': results['metadatas'][0][i]['description'],
-                'cuisine_type': results['metadatas'][0][i]['cuisine_type'],
-                'food_calories_per_serving': results['metadatas'][0][i]['calories'],
-                'similarity_score': similarity_score,
-                'distance': results['distances'][0][i]
-            }
-            formatted_results.append(result)
-        
-        return formatted_results
-        
-    except Exception as e:
-        print(f"Error in similarity search: {e}")
-        return []
\ No newline at end of file
+# Similarity search now lives in modules.query_engine; these names are kept for existing imports.
+from modules.query_engine import perform_similarity_search, perform_similarity_search_batch
@@ -1,50 +1,236 @@
-import chromadb
-from chromadb.utils import embedding_functions
 from typing import List, Dict, Any, Optional
-from modules.load_food_data import load_food_data, populate_similarity_collection
+from modules.load_food_data import iter_food_data, iter_similarity_records
+from modules.ingest import DEFAULT_BATCH_SIZE, ingest_records, resolve_batch_size
+from contextlib import nullcontext
+from modules.parallel_embedding import DEFAULT_ENCODE_BATCH_SIZE, ParallelEmbeddingFunction
+from modules.embedding_cache import CachedEmbeddingFunction
+from modules.query_cache import invalidate_collection
+from modules.faiss_backend import DEFAULT_FAISS_INDEX, create_faiss_collection, open_faiss_collection
+import hashlib
 import os
 
 root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-def create_chroma_client():
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+FOOD_COLLECTION_NAME = "food_collection"
+VECTOR_BACKENDS = ("chroma", "faiss")
+# Environment variable holding each backend's default persist directory
+PERSIST_DIR_SETTINGS = {"chroma": "CHROMA_PERSIST_DIR", "faiss": "FAISS_PERSIST_DIR"}
+
+_embedding_functions = {}
+
+def create_chroma_client(persist_directory: Optional[str] = None):
+    """Create an on-disk ChromaDB client when a directory is given, in-memory otherwise"""
+    import chromadb
+
+    if persist_directory:
+        return chromadb.PersistentClient(path=persist_directory)
     return chromadb.Client()
 
-def add_to_collection(collection, documents, metadatas, ids):
-    collection.add(
-        documents=documents,
-        metadatas=metadatas,
-        ids=ids
-    )   
-    return collection 
+def get_embedding_function(model_name: str = EMBEDDING_MODEL):
+    """Return the sentence transformer embedding function shared by this process
+
+    The model weights are loaded on the first embedding call, not here.
+    """
+    if model_name not in _embedding_functions:
+        from modules.lazy_embedding import LazySentenceTransformerEmbeddingFunction
+
+        _embedding_functions[model_name] = LazySentenceTransformerEmbeddingFunction(
+            model_name=model_name
+        )
+    return _embedding_functions[model_name]
+
+def create_ingestion_encoder(workers: Optional[int] = None, encode_batch_size: int = DEFAULT_ENCODE_BATCH_SIZE,
+                             use_cache: bool = True):
+    """Return a context manager yielding the encoder used to embed documents on ingestion
+
+    With more than one worker the documents are encoded by a process pool,
+    otherwise the shared in-process embedding function is used. Unless disabled,
+    the encoder is wrapped in the on-disk embedding cache so unchanged documents
+    are never encoded twice.
+    """
+    if workers and workers > 1:
+        encoder = ParallelEmbeddingFunction(EMBEDDING_MODEL, workers=workers, batch_size=encode_batch_size)
+    else:
+        encoder = get_embedding_function()
+    if use_cache:
+        return CachedEmbeddingFunction(encoder, EMBEDDING_MODEL)
+    return encoder if hasattr(encoder, "__enter__") else nullcontext(encoder)
+
+def compute_dataset_fingerprint(file_path: str, model_name: str = EMBEDDING_MODEL) -> str:
+    """Hash the dataset file together with the embedding model name"""
+    digest = hashlib.sha256(model_name.encode('utf-8'))
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def add_to_collection(collection, documents, metadatas, ids, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Add documents to the collection in bounded batches with the shared encoder"""
+    ingest_records(
+        collection,
+        zip(documents, metadatas, ids),
+        embedding_function=get_embedding_function(),
+        batch_size=batch_size
+    )
+    return collection
+
+def open_persisted_collection(client, collection_name: str):
+    """Return the stored collection, or None if it does not exist yet"""
+    try:
+        return client.get_collection(
+            name=collection_name,
+            embedding_function=get_embedding_function()
+        )
+    except Exception:
+        return None
+
+def fetch_content_hashes(collection, page_size: int = 1000) -> Dict[str, str]:
+    """Map every stored id to the content hash recorded in its metadata"""
+    hashes = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        if not page['ids']:
+            break
+        for doc_id, metadata in zip(page['ids'], page['metadatas']):
+            hashes[doc_id] = (metadata or {}).get("content_hash")
+        offset += len(page['ids'])
+    return hashes
+
+def sync_food_collection(collection, records, batch_size: int = DEFAULT_BATCH_SIZE,
+                         embedding_function=None) -> Dict[str, int]:
+    """Upsert new or changed records and delete removed ones, comparing content hashes"""
+    stored_hashes = fetch_content_hashes(collection)
+    seen_ids = set()
+    stats = {"upserted": 0, "deleted": 0, "unchanged": 0}
 
-def create_similarity_search_collection(collection_name: str, collection_metadata: dict = None):
+    def changed_records():
+        for document, metadata, doc_id in records:
+            seen_ids.add(doc_id)
+            if stored_hashes.get(doc_id) == metadata.get("content_hash"):
+                stats["unchanged"] += 1
+                continue
+            yield document, metadata, doc_id
+
+    stats["upserted"] = ingest_records(
+        collection,
+        changed_records(),
+        embedding_function=embedding_function or get_embedding_function(),
+        batch_size=batch_size,
+        upsert=True
+    )
+
+    removed = [doc_id for doc_id in stored_hashes if doc_id not in seen_ids]
+    for start in range(0, len(removed), batch_size):
+        collection.delete(ids=removed[start:start + batch_size])
+    if removed:
+        invalidate_collection(collection)
+    stats["deleted"] = len(removed)
+
+    print(f"Synced food collection: {stats['upserted']} upserted, "
+          f"{stats['deleted']} deleted, {stats['unchanged']} unchanged")
+    return stats
+
+def create_similarity_search_collection(collection_name: str, collection_metadata: dict = None, client=None):
     """Create ChromaDB collection with sentence transformer embeddings"""
-    client = create_chroma_client()
+    client = client or create_chroma_client()
     try:
         # Try to delete existing collection to start fresh
         client.delete_collection(collection_name)
     except:
         pass
-    
-    # Create embedding function
-    sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
-    )
-    
+
     # Create new collection
     return client.create_collection(
         name=collection_name,
         metadata=collection_metadata,
         configuration={
             "hnsw": {"space": "cosine"},
-            "embedding_function": sentence_transformer_ef
+            "embedding_function": get_embedding_function()
         }
     )
 
-def initiate_food_collection(): 
-    """Initiate food collection with ChromaDB"""
-    file_path = os.path.join(root_path, "FoodDataSet.json")  
-    food_items = load_food_data(file_path)
-    collection = create_similarity_search_collection("food_collection")
-    documents, metadatas, ids = populate_similarity_collection(collection, food_items)
-    add_to_collection(collection, documents, metadatas, ids)
-    return collection
\ No newline at end of file
+def open_food_collection(backend: str, client, persist_directory: str, faiss_index_type: str):
+    """Return the persisted food collection for the backend, or None"""
+    if backend == "faiss":
+        return open_faiss_collection(persist_directory, FOOD_COLLECTION_NAME, faiss_index_type,
+                                     embedding_function=get_embedding_function())
+    return open_persisted_collection(client, FOOD_COLLECTION_NAME)
+
+def create_food_collection(backend: str, collection_metadata: Optional[dict], client,
+                           persist_directory: Optional[str], faiss_index_type: str):
+    """Create an empty food collection on the chosen vector backend"""
+    if backend == "faiss":
+        return create_faiss_collection(FOOD_COLLECTION_NAME, collection_metadata, persist_directory,
+                                       faiss_index_type, embedding_function=get_embedding_function())
+    return create_similarity_search_collection(FOOD_COLLECTION_NAME, collection_metadata, client)
+
+def initiate_food_collection(persist_directory: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                             embedding_workers: Optional[int] = None,
+                             encode_batch_size: int = DEFAULT_ENCODE_BATCH_SIZE,
+                             use_embedding_cache: bool = True,
+                             backend: Optional[str] = None,
+                             faiss_index_type: Optional[str] = None):
+    """Initiate food collection with ChromaDB or FAISS
+
+    When a persist directory is given (or CHROMA_PERSIST_DIR, FAISS_PERSIST_DIR for
+    the FAISS backend, is set) the collection is stored on disk. An unchanged
+    dataset is reopened without building the encoder or touching the embedding
+    cache; a changed one is synced so only new or edited dishes are re-embedded.
+    With embedding_workers > 1 documents are encoded by a pool of worker processes,
+    and document embeddings are reused from the on-disk cache (EMBEDDING_CACHE_DIR).
+    The backend ("chroma" or "faiss", default VECTOR_BACKEND) selects the vector
+    store; FAISS builds a flat, ivf-flat, ivf-pq or hnsw index (FAISS_INDEX_TYPE).
+    """
+    file_path = os.path.join(root_path, "FoodDataSet.json")
+    backend = backend or os.getenv("VECTOR_BACKEND", "chroma")
+    faiss_index_type = faiss_index_type or DEFAULT_FAISS_INDEX
+    if backend not in VECTOR_BACKENDS:
+        raise ValueError(f"Unknown vector backend {backend!r}, expected one of {VECTOR_BACKENDS}")
+    persist_directory = persist_directory or os.getenv(PERSIST_DIR_SETTINGS[backend])
+
+    client = None
+    if backend == "chroma":
+        client = create_chroma_client(persist_directory)
+        batch_size = resolve_batch_size(client, batch_size)
+
+    # The fingerprint is checked before the encoder (and its on-disk cache) is
+    # built, so a warm start touches nothing but the stored collection
+    collection = None
+    collection_metadata = None
+    stored_metadata = {}
+    if persist_directory:
+        fingerprint = compute_dataset_fingerprint(file_path)
+        collection_metadata = {"dataset_fingerprint": fingerprint, "embedding_model": EMBEDDING_MODEL}
+        collection = open_food_collection(backend, client, persist_directory, faiss_index_type)
+        stored_metadata = (collection.metadata or {}) if collection is not None else {}
+        if stored_metadata.get("dataset_fingerprint") == fingerprint:
+            print(f"Reusing persisted food collection from {persist_directory}")
+            return collection
+
+    with create_ingestion_encoder(embedding_workers, encode_batch_size, use_embedding_cache) as encoder:
+        if collection is not None and stored_metadata.get("embedding_model") == EMBEDDING_MODEL:
+            records = iter_similarity_records(iter_food_data(file_path))
+            sync_food_collection(collection, records, batch_size, embedding_function=encoder)
+            collection.modify(metadata=collection_metadata)
+            return collection
+
+        # The fingerprint is stamped only once every record is in; an interrupted
+        # build carries just the model name, so the next start syncs it instead
+        # of reusing it as complete.
+        initial_metadata = {"embedding_model": EMBEDDING_MODEL} if collection_metadata else None
+        collection = create_food_collection(backend, initial_metadata, client, persist_directory,
+                                            faiss_index_type)
+        total = ingest_records(
+            collection,
+            iter_similarity_records(iter_food_data(file_path)),
+            embedding_function=encoder,
+            batch_size=batch_size
+        )
+        if backend == "faiss":
+            collection.persist()
+        if collection_metadata:
+            collection.modify(metadata=collection_metadata)
+        print(f"Successfully loaded {total} food items from {file_path}")
+        return collection
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "vector-database-learning", "embeddings")
+
+
+def text_hash(text: str) -> str:
+    """Stable cache key for a document text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Append-only on-disk embedding store for a single model
+
+    Each model gets its own directory holding ``vectors.f32`` (a float32 matrix
+    read through a memory map) and ``index.tsv`` (one ``<text hash>\\t<row>``
+    line per vector). Appends take an exclusive file lock, so several processes
+    can share one cache directory. chromadb_example and langchain_examples import
+    this module too, so every project shares the same cache for the same model.
+    """
+
+    def __init__(self, model_name: str, cache_dir: Optional[str] = None):
+        cache_dir = cache_dir or os.getenv("EMBEDDING_CACHE_DIR") or DEFAULT_CACHE_DIR
+        slug = re.sub(r'[^A-Za-z0-9._-]+', '_', model_name)
+        self.directory = os.path.join(cache_dir, slug)
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.tsv")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.model_name = model_name
+        self.dimension = None
+        self._rows: Dict[str, int] = {}
+        self._matrix = None
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _load(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as file:
+                self.dimension = json.load(file)["dimension"]
+        if self.dimension is None or not os.path.exists(self.index_path):
+            return
+
+        available_rows = self._available_rows()
+        with open(self.index_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                key, _, row = line.rstrip('\n').partition('\t')
+                # Ignore index lines whose vector write never completed
+                if row.isdigit() and int(row) < available_rows:
+                    self._rows[key] = int(row)
+
+    def _available_rows(self) -> int:
+        if self.dimension is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (4 * self.dimension)
+
+    def _open_matrix(self):
+        if self._matrix is None:
+            rows = self._available_rows()
+            if rows == 0:
+                return None
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                     shape=(rows, self.dimension))
+        return self._matrix
+
+    def _write_meta(self) -> None:
+        # Renamed into place so a concurrent reader never sees a partial meta.json
+        temp_path = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({"model_name": self.model_name, "dimension": self.dimension}, file)
+        os.replace(temp_path, self.meta_path)
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Return the cached vector for each key, or None where it is missing"""
+        with self._lock:
+            rows = [self._rows.get(key) for key in keys]
+            if all(row is None for row in rows):
+                return [None] * len(keys)
+            matrix = self._open_matrix()
+            return [np.array(matrix[row]) if row is not None else None for row in rows]
+
+    def put_many(self, keys: List[str], embeddings) -> None:
+        """Append vectors for keys that are not cached yet"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(keys):
+            raise ValueError("Expected one embedding vector per key")
+
+        with self._lock:
+            with open(self.vectors_path, 'ab') as vectors_file:
+                if fcntl is not None:
+                    fcntl.flock(vectors_file, fcntl.LOCK_EX)
+                try:
+                    if self.dimension is None:
+                        # Another process may have created the cache since it was loaded
+                        self._load()
+                    if self.dimension is None:
+                        self.dimension = int(vectors.shape[1])
+                        self._write_meta()
+                    elif vectors.shape[1] != self.dimension:
+                        raise ValueError(f"Expected {self.dimension}-dimensional embeddings, got {vectors.shape[1]}")
+
+                    # Drop any partial row a torn earlier write left behind, and make
+                    # the vectors durable before the index lines that point at them
+                    first_row = vectors_file.seek(0, os.SEEK_END) // (4 * self.dimension)
+                    vectors_file.truncate(first_row * 4 * self.dimension)
+                    vectors_file.write(vectors.tobytes())
+                    vectors_file.flush()
+                    os.fsync(vectors_file.fileno())
+                    with open(self.index_path, 'a', encoding='utf-8') as index_file:
+                        for offset, key in enumerate(keys):
+                            index_file.write(f"{key}\t{first_row + offset}\n")
+                            self._rows[key] = first_row + offset
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(vectors_file, fcntl.LOCK_UN)
+            self._matrix = None
+
+
+class CachedEmbeddingFunction:
+    """Embedding function wrapper that only encodes texts missing from the cache"""
+
+    def __init__(self, embedding_function, model_name: str, cache: Optional[EmbeddingCache] = None,
+                 cache_dir: Optional[str] = None):
+        self.embedding_function = embedding_function
+        self.cache = cache or EmbeddingCache(model_name, cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        texts = list(input)
+        keys = [text_hash(text) for text in texts]
+        embeddings = self.cache.get_many(keys)
+
+        # Encode each distinct missing text once
+        missing: Dict[str, int] = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None and keys[i] not in missing:
+                missing[keys[i]] = i
+
+        self.misses += len(missing)
+        self.hits += len(texts) - sum(1 for embedding in embeddings if embedding is None)
+
+        if missing:
+            computed = self.embedding_function([texts[i] for i in missing.values()])
+            computed = np.asarray(computed, dtype=np.float32)
+            self.cache.put_many(list(missing), computed)
+            by_key = dict(zip(missing, computed))
+            embeddings = [embedding if embedding is not None else by_key[key]
+                          for key, embedding in zip(keys, embeddings)]
+
+        return embeddings
+
+    def __enter__(self):
+        if hasattr(self.embedding_function, "__enter__"):
+            self.embedding_function.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if hasattr(self.embedding_function, "__exit__"):
+            self.embedding_function.__exit__(exc_type, exc_value, traceback)
@@ -0,0 +1,474 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import uuid
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+# faiss is an optional dependency (pip install 'food-search[faiss]'); it is
+# imported when the first index is built or loaded.
+
+FAISS_INDEX_TYPES = ("flat", "ivf-flat", "ivf-pq", "hnsw")
+DEFAULT_FAISS_INDEX = os.getenv("FAISS_INDEX_TYPE", "hnsw")
+
+# IVF: number of lists and lists probed per query; k-means wants ~39 points per list
+IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", "256"))
+IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", "16"))
+IVF_MIN_POINTS_PER_LIST = 39
+# PQ: sub-quantizers per vector and bits per code
+PQ_M = int(os.getenv("FAISS_PQ_M", "48"))
+PQ_NBITS = int(os.getenv("FAISS_PQ_NBITS", "8"))
+# HNSW: graph degree and construction/search beam widths
+HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+# HNSW: rebuild the graph once this share of its nodes belongs to deleted records
+HNSW_COMPACT_RATIO = float(os.getenv("FAISS_HNSW_COMPACT_RATIO", "0.2"))
+
+# Untrained IVF indexes buffer vectors until this many are available for training
+IVF_TRAIN_SIZE = int(os.getenv("FAISS_IVF_TRAIN_SIZE", str(IVF_NLIST * IVF_MIN_POINTS_PER_LIST)))
+
+
+def _import_faiss():
+    try:
+        import faiss
+    except ImportError as e:
+        raise ImportError("The FAISS backend needs faiss-cpu: pip install 'food-search[faiss]'") from e
+    return faiss
+
+
+def _normalize(vectors) -> np.ndarray:
+    """Unit-length float32 rows, so inner product equals cosine similarity"""
+    vectors = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _largest_divisor(dimension: int, limit: int) -> int:
+    return max(m for m in range(1, min(limit, dimension) + 1) if dimension % m == 0)
+
+
+def _compare(value, operator: str, expected) -> bool:
+    if operator == "$eq":
+        return value == expected
+    if operator == "$ne":
+        return value != expected
+    if operator == "$in":
+        return value in expected
+    if operator == "$nin":
+        return value not in expected
+    if value is None:
+        return False
+    if operator == "$lt":
+        return value < expected
+    if operator == "$lte":
+        return value <= expected
+    if operator == "$gt":
+        return value > expected
+    if operator == "$gte":
+        return value >= expected
+    raise ValueError(f"Unsupported where operator: {operator}")
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a ChromaDB-style where clause against one metadata dict"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(_compare(metadata.get(key), op, expected) for op, expected in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class FaissCollection:
+    """FAISS index with a sidecar metadata store behind the ChromaDB collection API
+
+    Supports the calls the food app makes on a collection (add, upsert, delete,
+    get, count, query, modify), so the ingestion, sync and query code paths work
+    unchanged. Vectors are normalized and searched by inner product; distances are
+    reported as ``1 - cosine similarity`` like a cosine ChromaDB collection.
+
+    Index types trade recall, latency and memory:
+
+    * ``flat``: exact search, 4 bytes per dimension
+    * ``ivf-flat``: clustered exact vectors, probes ``IVF_NPROBE`` of the lists
+    * ``ivf-pq``: clustered and product-quantized, ~``PQ_M`` bytes per vector
+    * ``hnsw``: graph search, fastest queries, most memory
+
+    Ids, documents and metadata live in a SQLite file next to the index when a
+    persist directory is given (in memory otherwise). Metadata filters are
+    evaluated on the sidecar store and passed to FAISS as an ``IDSelector``.
+
+    HNSW graphs can't drop nodes, so deleted (and upserted) records stay in the
+    graph, masked at query time, until ``compact()`` rebuilds it from the live
+    vectors. That happens automatically once deleted nodes make up
+    ``HNSW_COMPACT_RATIO`` of the graph.
+    """
+
+    def __init__(self, name: str, embedding_function=None, index_type: str = DEFAULT_FAISS_INDEX,
+                 persist_directory: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
+        if index_type not in FAISS_INDEX_TYPES:
+            raise ValueError(f"Unknown FAISS index type {index_type!r}, expected one of {FAISS_INDEX_TYPES}")
+        self.name = name
+        self.id = f"faiss-{name}-{uuid.uuid4().hex[:8]}"
+        self.index_type = index_type
+        self.metadata = dict(metadata or {})
+        self.persist_directory = persist_directory
+        self._embedding_function = embedding_function
+        self._index = None
+        self._dimension = None
+        self._next_label = 0
+        self._pending = {}
+        self._tombstones = 0
+        self._records: Dict[int, tuple] = {}
+        self._labels: Dict[str, int] = {}
+        self._selector_cache: Dict[str, np.ndarray] = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._db = None
+        if persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(persist_directory, "records.sqlite"), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS records "
+                             "(label INTEGER PRIMARY KEY, id TEXT UNIQUE, document TEXT, metadata TEXT)")
+
+    # -- index construction -------------------------------------------------
+
+    def _index_factory(self, n_train: int) -> str:
+        if self.index_type == "flat":
+            return "IDMap,Flat"
+        if self.index_type == "hnsw":
+            return f"IDMap,HNSW{HNSW_M}"
+        nlist = max(1, min(IVF_NLIST, n_train // IVF_MIN_POINTS_PER_LIST))
+        if self.index_type == "ivf-flat":
+            return f"IDMap,IVF{nlist},Flat"
+        pq_m = _largest_divisor(self._dimension, PQ_M)
+        nbits = max(1, min(PQ_NBITS, int(math.log2(max(n_train, 2)))))
+        return f"IDMap,IVF{nlist},PQ{pq_m}x{nbits}"
+
+    def _build_index(self, training_vectors: Optional[np.ndarray] = None):
+        faiss = _import_faiss()
+        n_train = len(training_vectors) if training_vectors is not None else 0
+        index = faiss.index_factory(self._dimension, self._index_factory(n_train), faiss.METRIC_INNER_PRODUCT)
+        if self.index_type == "hnsw":
+            faiss.downcast_index(index.index).hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        if not index.is_trained:
+            index.train(training_vectors)
+        return index
+
+    @property
+    def _needs_training(self) -> bool:
+        return self.index_type in ("ivf-flat", "ivf-pq")
+
+    def _flush_pending(self, force: bool = False) -> None:
+        """Train the index once enough vectors are buffered, then add the buffer"""
+        if not self._pending:
+            return
+        if self._index is None and self._needs_training and not force and len(self._pending) < IVF_TRAIN_SIZE:
+            return
+        labels = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        vectors = np.vstack(list(self._pending.values()))
+        if self._index is None:
+            self._index = self._build_index(vectors if self._needs_training else None)
+        self._index.add_with_ids(vectors, labels)
+        self._pending.clear()
+
+    def _add_vectors(self, labels: List[int], vectors: np.ndarray) -> None:
+        if self._dimension is None:
+            self._dimension = vectors.shape[1]
+        if self._index is None and self._needs_training:
+            self._pending.update(zip(labels, vectors))
+            self._flush_pending()
+        else:
+            if self._index is None:
+                self._index = self._build_index()
+            self._index.add_with_ids(vectors, np.asarray(labels, dtype=np.int64))
+
+    def compact(self) -> None:
+        """Rebuild an HNSW graph without the nodes of deleted records
+
+        Other index types remove vectors on delete, so there is nothing to do.
+        """
+        with self._lock:
+            if self.index_type != "hnsw" or self._index is None or not self._tombstones:
+                return
+            faiss = _import_faiss()
+            index_labels = faiss.vector_to_array(self._index.id_map)
+            live = np.isin(index_labels, np.fromiter(self._records, dtype=np.int64, count=len(self._records)))
+            vectors = faiss.downcast_index(self._index.index).reconstruct_n(0, self._index.ntotal)
+            index = self._build_index()
+            if live.any():
+                index.add_with_ids(np.ascontiguousarray(vectors[live]), index_labels[live])
+            self._mark_dirty()
+            self._index = index
+            self._tombstones = 0
+            self._selector_cache.clear()
+
+    def _compact_if_needed(self) -> None:
+        if self._index is not None and self._tombstones > HNSW_COMPACT_RATIO * self._index.ntotal:
+            self.compact()
+
+    def _remove_labels(self, labels: List[int]) -> None:
+        for label in labels:
+            self._pending.pop(label, None)
+        if self._index is None or not labels:
+            return
+        if self.index_type == "hnsw":
+            # HNSW graphs can't drop nodes; removed labels are masked at query time
+            self._tombstones += len(labels)
+        else:
+            self._index.remove_ids(np.asarray(labels, dtype=np.int64))
+
+    # -- sidecar store -------------------------------------------------------
+
+    def _mark_dirty(self) -> None:
+        """Drop meta.json before the first change so a crash before persist() forces a rebuild"""
+        if self.persist_directory and not self._dirty:
+            meta_path = os.path.join(self.persist_directory, "meta.json")
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            self._dirty = True
+
+    def _store(self, rows: List[tuple]) -> None:
+        for label, doc_id, document, metadata in rows:
+            self._records[label] = (doc_id, document, metadata)
+            self._labels[doc_id] = label
+        if self._db is not None:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+                [(label, doc_id, document, json.dumps(metadata)) for label, doc_id, document, metadata in rows]
+            )
+            self._db.commit()
+
+    def _forget(self, labels: List[int]) -> None:
+        for label in labels:
+            doc_id = self._records.pop(label)[0]
+            del self._labels[doc_id]
+        if self._db is not None:
+            self._db.executemany("DELETE FROM records WHERE label = ?", [(label,) for label in labels])
+            self._db.commit()
+
+    # -- ChromaDB collection API ---------------------------------------------
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def modify(self, metadata: Optional[Dict[str, Any]] = None, **kwargs) -> None:
+        if metadata is not None:
+            self.metadata = dict(metadata)
+        self.persist()
+
+    def add(self, ids: List[str], documents: List[str], metadatas: Optional[List[Dict[str, Any]]] = None,
+            embeddings=None) -> None:
+        with self._lock:
+            duplicates = [doc_id for doc_id in ids if doc_id in self._labels]
+            if duplicates:
+                raise ValueError(f"Ids already exist in collection {self.name}: {duplicates[:5]}")
+            self._write(ids, documents, metadatas, embeddings)
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: Optional[List[Dict[str, Any]]] = None,
+               embeddings=None) -> None:
+        with self._lock:
+            self.delete(ids=[doc_id for doc_id in ids if doc_id in self._labels])
+            self._write(ids, documents, metadatas, embeddings)
+
+    def _write(self, ids, documents, metadatas, embeddings) -> None:
+        if not ids:
+            return
+        if embeddings is None:
+            embeddings = self._embedding_function(documents)
+        vectors = _normalize(embeddings)
+        labels = list(range(self._next_label, self._next_label + len(ids)))
+        self._next_label += len(ids)
+        metadatas = metadatas or [{} for _ in ids]
+        self._mark_dirty()
+        self._store(list(zip(labels, ids, documents, metadatas)))
+        self._add_vectors(labels, vectors)
+        self._selector_cache.clear()
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            if ids is None:
+                labels = [label for label, (_, _, metadata) in self._records.items() if matches_where(metadata, where)]
+            else:
+                labels = [self._labels[doc_id] for doc_id in ids if doc_id in self._labels]
+            if not labels:
+                return
+            self._mark_dirty()
+            self._remove_labels(labels)
+            self._forget(labels)
+            self._selector_cache.clear()
+            self._compact_if_needed()
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Optional[List[str]] = None) -> Dict[str, Any]:
+        include = include or ["documents", "metadatas"]
+        with self._lock:
+            if ids is not None:
+                labels = [self._labels[doc_id] for doc_id in ids if doc_id in self._labels]
+            else:
+                labels = list(self._records)
+            labels = [label for label in labels if matches_where(self._records[label][2], where)]
+            start = offset or 0
+            labels = labels[start:start + limit] if limit is not None else labels[start:]
+            rows = [self._records[label] for label in labels]
+
+        result = {"ids": [row[0] for row in rows], "included": include}
+        result["documents"] = [row[1] for row in rows] if "documents" in include else None
+        result["metadatas"] = [row[2] for row in rows] if "metadatas" in include else None
+        return result
+
+    def _allowed_labels(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Labels matching the filter, or None when every indexed vector is a candidate"""
+        if not where and not self._tombstones:
+            return None
+        key = json.dumps(where, sort_keys=True)
+        if key not in self._selector_cache:
+            self._selector_cache[key] = np.fromiter(
+                (label for label, (_, _, metadata) in self._records.items() if matches_where(metadata, where)),
+                dtype=np.int64
+            )
+        return self._selector_cache[key]
+
+    def _search_parameters(self, allowed: Optional[np.ndarray], k: int):
+        faiss = _import_faiss()
+        selector = faiss.IDSelectorBatch(len(allowed), faiss.swig_ptr(allowed)) if allowed is not None else None
+        if self.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW(efSearch=max(HNSW_EF_SEARCH, k))
+        elif self._needs_training:
+            params = faiss.SearchParametersIVF(nprobe=IVF_NPROBE)
+        else:
+            params = faiss.SearchParameters()
+        if selector is not None:
+            params.sel = selector
+        # The selector is only referenced from C++, keep it alive for the search
+        return params, selector
+
+    def query(self, query_embeddings=None, query_texts: Optional[List[str]] = None, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        include = include or ["metadatas", "documents", "distances"]
+        if query_embeddings is None:
+            query_embeddings = self._embedding_function(query_texts)
+        queries = _normalize(query_embeddings)
+
+        with self._lock:
+            self._flush_pending(force=True)
+            empty = {"ids": [[] for _ in queries], "distances": [[] for _ in queries],
+                     "metadatas": [[] for _ in queries], "documents": [[] for _ in queries],
+                     "included": include}
+            if self._index is None or not self._records:
+                return empty
+            allowed = self._allowed_labels(where)
+            if allowed is not None and not len(allowed):
+                return empty
+
+            k = min(n_results, len(self._records))
+            params, _selector = self._search_parameters(allowed, k)
+            scores, labels = self._index.search(queries, k, params=params)
+
+            result = {"ids": [], "distances": [], "metadatas": [], "documents": [], "included": include}
+            for row_scores, row_labels in zip(scores, labels):
+                hits = [(label, score) for label, score in zip(row_labels, row_scores)
+                        if label != -1 and label in self._records]
+                rows = [self._records[label] for label, _ in hits]
+                result["ids"].append([row[0] for row in rows])
+                result["distances"].append([1.0 - float(score) for _, score in hits])
+                result["metadatas"].append([row[2] for row in rows])
+                result["documents"].append([row[1] for row in rows])
+        return result
+
+    # -- persistence ---------------------------------------------------------
+
+    def persist(self) -> None:
+        """Write the index and collection metadata; the sidecar store is written as records change"""
+        if not self.persist_directory:
+            return
+        faiss = _import_faiss()
+        with self._lock:
+            self._flush_pending(force=True)
+            if self._index is not None:
+                index_path = os.path.join(self.persist_directory, "index.faiss")
+                temp_path = f"{index_path}.{os.getpid()}.tmp"
+                faiss.write_index(self._index, temp_path)
+                os.replace(temp_path, index_path)
+            state = {
+                "name": self.name,
+                "index_type": self.index_type,
+                "metadata": self.metadata,
+                "next_label": self._next_label,
+                "tombstones": self._tombstones,
+            }
+            # meta.json is written last: a directory without it is an unfinished build.
+            # Both files are renamed into place so a crash never leaves either one partial
+            meta_path = os.path.join(self.persist_directory, "meta.json")
+            temp_path = f"{meta_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as file:
+                json.dump(state, file)
+            os.replace(temp_path, meta_path)
+            self._dirty = False
+
+    @classmethod
+    def load(cls, persist_directory: str, embedding_function=None) -> Optional["FaissCollection"]:
+        """Reopen a persisted collection, or return None if there is none"""
+        meta_path = os.path.join(persist_directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as file:
+            state = json.load(file)
+
+        collection = cls(state["name"], embedding_function, state["index_type"], persist_directory, state["metadata"])
+        collection._next_label = state["next_label"]
+        collection._tombstones = state["tombstones"]
+        rows = collection._db.execute("SELECT label, id, document, metadata FROM records ORDER BY label")
+        for label, doc_id, document, metadata in rows:
+            collection._records[label] = (doc_id, document, json.loads(metadata))
+            collection._labels[doc_id] = label
+
+        index_path = os.path.join(persist_directory, "index.faiss")
+        if os.path.exists(index_path):
+            collection._index = _import_faiss().read_index(index_path)
+            collection._dimension = collection._index.d
+        return collection
+
+
+def faiss_collection_directory(persist_directory: str, collection_name: str) -> str:
+    return os.path.join(persist_directory, "faiss", collection_name)
+
+
+def open_faiss_collection(persist_directory: str, collection_name: str, index_type: str,
+                          embedding_function=None) -> Optional[FaissCollection]:
+    """Return the persisted FAISS collection if it exists and uses ``index_type``"""
+    collection = FaissCollection.load(faiss_collection_directory(persist_directory, collection_name),
+                                      embedding_function)
+    if collection is not None and collection.index_type != index_type:
+        print(f"Persisted FAISS index is {collection.index_type}, rebuilding as {index_type}")
+        return None
+    return collection
+
+
+def create_faiss_collection(collection_name: str, collection_metadata: Optional[Dict[str, Any]] = None,
+                            persist_directory: Optional[str] = None, index_type: str = DEFAULT_FAISS_INDEX,
+                            embedding_function=None) -> FaissCollection:
+    """Create an empty FAISS collection, replacing any persisted one of the same name"""
+    directory = None
+    if persist_directory:
+        directory = faiss_collection_directory(persist_directory, collection_name)
+        for file_name in ("meta.json", "index.faiss", "records.sqlite"):
+            path = os.path.join(directory, file_name)
+            if os.path.exists(path):
+                os.remove(path)
+    return FaissCollection(collection_name, embedding_function, index_type, directory, collection_metadata)
@@ -0,0 +1,145 @@
+"""Minimal local stand-in for the Anthropic Messages API
+
+Serves ``POST /v1/messages`` with either a JSON message or a server-sent event
+stream, so the chat engines can be exercised without network access or an API
+key. Point the SDK at it with ``ANTHROPIC_BASE_URL=http://127.0.0.1:<port>``.
+
+    python -m modules.fake_llm_server --port 8765 --token-delay 0.02
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+
+
+def fake_reply(request: Dict[str, Any]) -> str:
+    """Deterministic reply that echoes the start of the last user message"""
+    messages = request.get("messages") or [{}]
+    content = messages[-1].get("content", "")
+    if isinstance(content, list):
+        content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+    summary = " ".join(content.split()[:12])
+    return f"Here are some suggestions based on: {summary}"
+
+
+class FakeMessagesHandler(BaseHTTPRequestHandler):
+    token_delay = 0.0
+    reply = staticmethod(fake_reply)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/messages":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        text = self.reply(request)
+        model = request.get("model", "fake-model")
+
+        if request.get("stream"):
+            self._stream(model, text)
+        else:
+            self._send_json({
+                "id": "msg_fake",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 0, "output_tokens": len(text.split())},
+            })
+
+    def _send_json(self, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _event(self, name: str, payload: Dict[str, Any]):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _stream(self, model: str, text: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        tokens = [word + " " for word in text.split(" ")]
+        self._event("message_start", {"type": "message_start", "message": {
+            "id": "msg_fake", "type": "message", "role": "assistant", "model": model,
+            "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": 0, "output_tokens": 0},
+        }})
+        self._event("content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+        })
+        for token in tokens:
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            self._event("content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token},
+            })
+        self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": len(tokens)},
+        })
+        self._event("message_stop", {"type": "message_stop"})
+
+
+class FakeLLMServer:
+    """Run the fake Messages API on a background thread, e.g. inside a test"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token_delay: float = 0.0):
+        handler = type("Handler", (FakeMessagesHandler,), {"token_delay": token_delay})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Local fake Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-delay", type=float, default=0.0,
+                        help="Seconds to wait between streamed tokens")
+    args = parser.parse_args(argv)
+
+    server = FakeLLMServer(args.host, args.port, args.token_delay)
+    print(f"Fake LLM server listening on {server.base_url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
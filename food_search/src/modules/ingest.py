@@ -0,0 +1,54 @@
+import time
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+from modules.query_cache import invalidate_collection
+
+DEFAULT_BATCH_SIZE = 256
+
+Record = Tuple[str, Dict[str, Any], str]
+
+
+def resolve_batch_size(client, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Clamp the requested batch size to what the ChromaDB backend accepts"""
+    try:
+        max_batch_size = client.get_max_batch_size()
+    except Exception:
+        return batch_size
+    return max(1, min(batch_size, max_batch_size))
+
+
+def iter_batches(records: Iterable[Record], batch_size: int) -> Iterator[List[Record]]:
+    """Yield lists of at most batch_size records without materializing the input"""
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def ingest_records(collection, records: Iterable[Record], embedding_function=None,
+                   batch_size: int = DEFAULT_BATCH_SIZE, upsert: bool = False) -> int:
+    """Embed and write (document, metadata, id) records to the collection batch by batch
+
+    Only one batch of documents and embeddings is held in memory at a time. When
+    no embedding function is given the collection's own one is used.
+    """
+    write = collection.upsert if upsert else collection.add
+    total = 0
+    started = time.perf_counter()
+
+    for batch in iter_batches(records, batch_size):
+        documents = [record[0] for record in batch]
+        metadatas = [record[1] for record in batch]
+        ids = [record[2] for record in batch]
+
+        embeddings = embedding_function(documents) if embedding_function is not None else None
+        write(documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings)
+        invalidate_collection(collection)
+
+        total += len(ids)
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        print(f"   Ingested {total} items ({total / elapsed:.1f} items/sec)")
+
+    return total
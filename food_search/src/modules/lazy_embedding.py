@@ -0,0 +1,27 @@
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+
+class LazySentenceTransformerEmbeddingFunction(SentenceTransformerEmbeddingFunction):
+    """Sentence transformer embedding function that loads the model on first use
+
+    Keeps the name and config of ChromaDB's built-in function, so collections
+    persisted with it reopen unchanged, but reopening a collection or building
+    the CLI no longer pays for loading the model weights.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: str = "cpu",
+                 normalize_embeddings: bool = False, **kwargs):
+        self.model_name = model_name
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+        self.kwargs = kwargs
+
+    @property
+    def _model(self):
+        if self.model_name not in self.models:
+            from sentence_transformers import SentenceTransformer
+
+            self.models[self.model_name] = SentenceTransformer(
+                model_name_or_path=self.model_name, device=self.device, **self.kwargs
+            )
+        return self.models[self.model_name]
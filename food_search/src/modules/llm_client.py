@@ -0,0 +1,96 @@
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODEL = os.getenv("LLM_MODEL", "claude-3-haiku-20240307")
+
+# Connection pool, timeout and retry settings shared by the sync and async clients
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+_client_lock = threading.Lock()
+# The SDK and httpx are imported when the first client is built, keeping
+# non-LLM modes and --help fast to start.
+_client = None
+_async_client = None
+_request_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+_async_request_slots: Optional[asyncio.Semaphore] = None
+
+
+def _timeout():
+    import httpx
+
+    return httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+
+def _limits():
+    import httpx
+
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+
+
+def get_llm_client():
+    """Process-wide Anthropic client with a pooled keep-alive HTTP connection
+
+    Rate limits, overloads and connection errors are retried by the SDK with
+    exponential backoff and jitter (LLM_MAX_RETRIES attempts), honouring any
+    retry-after header the API sends.
+    """
+    from anthropic import Anthropic, DefaultHttpxClient
+
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Anthropic(
+                api_key=os.getenv("ANTHROPIC_API_KEY"),
+                max_retries=LLM_MAX_RETRIES,
+                timeout=_timeout(),
+                http_client=DefaultHttpxClient(limits=_limits(), timeout=_timeout()),
+            )
+        return _client
+
+
+def get_async_llm_client():
+    """Async counterpart of get_llm_client with the same pool and retry settings"""
+    from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            _async_client = AsyncAnthropic(
+                api_key=os.getenv("ANTHROPIC_API_KEY"),
+                max_retries=LLM_MAX_RETRIES,
+                timeout=_timeout(),
+                http_client=DefaultAsyncHttpxClient(limits=_limits(), timeout=_timeout()),
+            )
+        return _async_client
+
+
+@asynccontextmanager
+async def async_request_slot():
+    """Bound the number of in-flight async LLM requests to LLM_MAX_CONCURRENCY"""
+    global _async_request_slots
+    if _async_request_slots is None:
+        _async_request_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    async with _async_request_slots:
+        yield
+
+
+def generate_response(prompt: str, max_tokens: int = 1000, model: Optional[str] = None) -> str:
+    """Generate response using Anthropic Claude"""
+    with _request_slots:
+        message = get_llm_client().messages.create(
+            model=model or MODEL,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+    return message.content[0].text
@@ -1,25 +1,13 @@
-import os
-from dotenv import load_dotenv
 from typing import List, Dict, Any
-from anthropic import Anthropic
-from modules.create_basic import perform_similarity_search
+from modules.llm_client import MODEL, generate_response
+from modules.query_engine import (
+    perform_filtered_similarity_search,
+    perform_similarity_search,
+    perform_similarity_search_batch,
+)
+from modules.query_parser import parse_query
 from modules.create_chroma import initiate_food_collection
-
-load_dotenv()
-
-# Initialize Anthropic client
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-MODEL = os.getenv("LLM_MODEL", "claude-3-haiku-20240307")
-
-
-def generate_response(prompt: str) -> str:
-    """Generate response using Anthropic Claude"""
-    message = client.messages.create(
-        model=MODEL,
-        max_tokens=1000,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return message.content[0].text
+from modules.response_cache import response_cache, response_cache_key
 
 def prepare_context_for_llm(query: str, search_results: List[Dict]) -> str:
     """Prepare structured context from search results for LLM"""
@@ -60,12 +48,11 @@ def prepare_context_for_llm(query: str, search_results: List[Dict]) -> str:
     
     return "\n".join(context_parts)
 
-def generate_llm_rag_response(query: str, search_results: List[Dict]) -> str:
-    """Generate response using Anthropic Claude with retrieved context"""
-    try:
-        context = prepare_context_for_llm(query, search_results)
-        
-        prompt = f'''You are a helpful food recommendation assistant. A user is asking for food recommendations, and I've retrieved relevant options from a food database.
+def build_rag_prompt(query: str, search_results: List[Dict]) -> str:
+    """Build the recommendation prompt from the query and retrieved context"""
+    context = prepare_context_for_llm(query, search_results)
+
+    return f'''You are a helpful food recommendation assistant. A user is asking for food recommendations, and I've retrieved relevant options from a food database.
 
     User Query: "{query}"
 
@@ -81,7 +68,17 @@ def generate_llm_rag_response(query: str, search_results: List[Dict]) -> str:
 
     Response:'''
 
-        return generate_response(prompt)
+def generate_llm_rag_response(query: str, search_results: List[Dict]) -> str:
+    """Generate response using Anthropic Claude with retrieved context"""
+    try:
+        query_embedding, food_ids, filters = response_cache_key(query, search_results)
+        cached_response = response_cache.lookup(query_embedding, food_ids, MODEL, filters)
+        if cached_response is not None:
+            return cached_response
+
+        response = generate_response(build_rag_prompt(query, search_results))
+        response_cache.store(query_embedding, food_ids, MODEL, response, filters)
+        return response
             
     except Exception as e:
         print(f"❌ LLM Error: {e}")
@@ -118,7 +115,7 @@ def start_chat(collection):
     print("  • 'Suggest some protein-rich breakfast options'")
     print("\nCommands:")
     print("  • 'help' - Show detailed help menu")
-    print("  • 'compare' - Compare recommendations for two different queries")
+    print("  • 'compare' - Compare recommendations for two or more queries")
     print("  • 'quit' - Exit the chatbot")
     print("-" * 70)
     
@@ -158,12 +155,33 @@ def start_chat(collection):
         except Exception as e:
             print(f"❌ Bot: Sorry, I encountered an error: {e}")
 
+def retrieve_for_query(collection, query: str, n_results: int = 3):
+    """Push cuisine/calorie constraints named in the query into the index filter
+
+    Falls back to an unfiltered search when the query names no filters or the
+    filtered search finds nothing.
+    """
+    parsed = parse_query(query)
+    if parsed.has_filters:
+        print(f"🎯 Filters: {parsed.describe()}")
+        search_results = perform_filtered_similarity_search(
+            collection, parsed.text,
+            cuisine_filter=parsed.cuisine,
+            max_calories=parsed.max_calories,
+            min_calories=parsed.min_calories,
+            n_results=n_results
+        )
+        if search_results:
+            return search_results
+        print("   No matches with those filters, searching without them...")
+    return perform_similarity_search(collection, query, n_results)
+
 def handle_rag_query(collection, query: str, conversation_history: List[str]):
     """Handle user query with RAG approach using Anthropic Claude"""
     print(f"\n🔍 Searching vector database for: '{query}'...")
     
     # Perform similarity search with more results for better context
-    search_results = perform_similarity_search(collection, query, 3)
+    search_results = retrieve_for_query(collection, query, 3)
     
     if not search_results:
         print("🤖 Bot: I couldn't find any food items matching your request.")
@@ -178,7 +196,10 @@ def handle_rag_query(collection, query: str, conversation_history: List[str]):
     
     print(f"\n🤖 Bot: {ai_response}")
     
-    # Show detailed results for reference
+    show_search_details(search_results)
+
+def show_search_details(search_results):
+    """Show detailed results for reference"""
     print(f"\n📊 Search Results Details:")
     print("-" * 45)
     for i, result in enumerate(search_results[:3], 1):
@@ -187,60 +208,89 @@ def handle_rag_query(collection, query: str, conversation_history: List[str]):
         if i < 3:
             print()
 
+MAX_COMPARISON_QUERIES = 5
+
+def comparison_query_prompt(count: int) -> str:
+    """Prompt for the next comparison query, given how many were entered so far"""
+    optional = " (blank to finish)" if count >= 2 else ""
+    return f"Enter food query #{count + 1}{optional}: "
+
+def read_comparison_queries(max_queries: int = MAX_COMPARISON_QUERIES) -> List[str]:
+    """Prompt for two or more food queries; a blank line ends the list"""
+    queries = []
+    while len(queries) < max_queries:
+        query = input(comparison_query_prompt(len(queries))).strip()
+        if not query:
+            if len(queries) >= 2:
+                break
+            continue
+        queries.append(query)
+    return queries
+
+def retrieve_for_comparison(collection, queries: List[str], n_results: int = 3):
+    """Fetch results for every compared query together in a single batched search"""
+    return perform_similarity_search_batch(collection, queries, n_results)
+
 def handle_comparison_mode(collection):
-    """Enhanced comparison between two food queries using LLM"""
+    """Enhanced comparison between two or more food queries using LLM"""
     print("\n🔄 ENHANCED COMPARISON MODE")
     print("   Powered by AI Analysis")
     print("-" * 35)
     
-    query1 = input("Enter first food query: ").strip()
-    query2 = input("Enter second food query: ").strip()
+    queries = read_comparison_queries()
     
-    if not query1 or not query2:
-        print("❌ Please enter both queries for comparison")
+    if len(queries) < 2:
+        print("❌ Please enter at least two queries for comparison")
         return
     
-    print(f"\n🔍 Analyzing '{query1}' vs '{query2}' with AI...")
+    print(f"\n🔍 Analyzing {' vs '.join(repr(q) for q in queries)} with AI...")
     
-    # Get results for both queries
-    results1 = perform_similarity_search(collection, query1, 3)
-    results2 = perform_similarity_search(collection, query2, 3)
+    results_list = retrieve_for_comparison(collection, queries, 3)
     
     # Generate AI-powered comparison
-    comparison_response = generate_llm_comparison(query1, query2, results1, results2)
+    comparison_response = generate_llm_multi_comparison(queries, results_list)
     
     print(f"\n🤖 AI Analysis: {comparison_response}")
     
-    # Show side-by-side results
+    show_comparison_table(queries, results_list)
+
+def show_comparison_table(queries: List[str], results_list: List[List[Dict]]):
+    """Show side-by-side results, one column per query"""
+    width = max(60 // len(queries), 15)
+    separator = " | "
     print(f"\n📊 DETAILED COMPARISON")
     print("=" * 60)
-    print(f"{'Query 1: ' + query1[:20] + '...' if len(query1) > 20 else 'Query 1: ' + query1:<30} | {'Query 2: ' + query2[:20] + '...' if len(query2) > 20 else 'Query 2: ' + query2}")
+    headers = []
+    for i, query in enumerate(queries, 1):
+        label = f"Query {i}: " + (query[:20] + '...' if len(query) > 20 else query)
+        headers.append(f"{label[:width]:<{width}}")
+    print(separator.join(headers).rstrip())
     print("-" * 60)
     
-    max_results = max(len(results1), len(results2))
+    max_results = max(len(results) for results in results_list)
     for i in range(min(max_results, 3)):
-        left = f"{results1[i]['food_name']} ({results1[i]['similarity_score']*100:.0f}%)" if i < len(results1) else "---"
-        right = f"{results2[i]['food_name']} ({results2[i]['similarity_score']*100:.0f}%)" if i < len(results2) else "---"
-        print(f"{left[:30]:<30} | {right[:30]}")
+        cells = []
+        for results in results_list:
+            cell = f"{results[i]['food_name']} ({results[i]['similarity_score']*100:.0f}%)" if i < len(results) else "---"
+            cells.append(f"{cell[:width]:<{width}}")
+        print(separator.join(cells).rstrip())
 
-def generate_llm_comparison(query1: str, query2: str, results1: List[Dict], results2: List[Dict]) -> str:
-    """Generate AI-powered comparison between two queries"""
-    try:
-        context1 = prepare_context_for_llm(query1, results1[:3])
-        context2 = prepare_context_for_llm(query2, results2[:3])
-        
-        comparison_prompt = f'''You are analyzing and comparing two different food preference queries. Please provide a thoughtful comparison.
+def build_comparison_prompt(queries: List[str], results_list: List[List[Dict]]) -> str:
+    """Build one comparison prompt once the context for every query is ready"""
+    sections = []
+    for i, (query, results) in enumerate(zip(queries, results_list), 1):
+        context = prepare_context_for_llm(query, results[:3])
+        sections.append(f'''    Query {i}: "{query}"
+    Top Results for Query {i}:
+    {context}''')
+    query_sections = "\n\n".join(sections)
 
-    Query 1: "{query1}"
-    Top Results for Query 1:
-    {context1}
+    return f'''You are analyzing and comparing {len(queries)} different food preference queries. Please provide a thoughtful comparison.
 
-    Query 2: "{query2}"
-    Top Results for Query 2:
-    {context2}
+{query_sections}
 
     Please provide a short comparison that:
-    1. Highlights the key differences between these two food preferences
+    1. Highlights the key differences between these food preferences
     2. Notes any similarities or overlaps
     3. Explains which query might be better for different situations
     4. Recommends the best option from each query
@@ -248,10 +298,29 @@ def generate_llm_comparison(query1: str, query2: str, results1: List[Dict], resu
 
     Comparison:'''
 
-        return generate_response(comparison_prompt)
+def generate_llm_multi_comparison(queries: List[str], results_list: List[List[Dict]]) -> str:
+    """Generate AI-powered comparison between any number of queries"""
+    try:
+        return generate_response(build_comparison_prompt(queries, results_list))
             
     except Exception as e:
-        return generate_simple_comparison(query1, query2, results1, results2)
+        return generate_simple_multi_comparison(queries, results_list)
+
+def generate_llm_comparison(query1: str, query2: str, results1: List[Dict], results2: List[Dict]) -> str:
+    """Generate AI-powered comparison between two queries"""
+    return generate_llm_multi_comparison([query1, query2], [results1, results2])
+
+def generate_simple_multi_comparison(queries: List[str], results_list: List[List[Dict]]) -> str:
+    """Simple comparison fallback for any number of queries"""
+    found = [(query, results) for query, results in zip(queries, results_list) if results]
+    if not found:
+        return "No results found for any query."
+    
+    missing = [query for query, results in zip(queries, results_list) if not results]
+    parts = [f"For '{query}', I recommend {results[0]['food_name']}." for query, results in found]
+    if missing:
+        parts.append(f"No results were found for {', '.join(repr(q) for q in missing)}.")
+    return " ".join(parts)
 
 def generate_simple_comparison(query1: str, query2: str, results1: List[Dict], results2: List[Dict]) -> str:
     """Simple comparison fallback"""
@@ -277,11 +346,12 @@ def show_help():
     print("  • Ask about benefits: 'protein-rich foods for workout recovery'")
     print("\nSpecial features:")
     print("  • 🔍 Vector similarity search finds relevant foods")
+    print("  • 🎯 Cuisines and calorie limits in your query become search filters")
     print("  • 🧠 AI analysis provides contextual explanations")
     print("  • 📊 Detailed nutritional and cuisine information")
     print("  • 🔄 Smart comparison between different preferences")
     print("\nCommands:")
-    print("  • 'compare' - AI-powered comparison of two queries")
+    print("  • 'compare' - AI-powered comparison of two or more queries")
     print("  • 'help' - Show this help menu")
     print("  • 'quit' - Exit the chatbot")
     print("\nTips for better results:")
@@ -1,54 +1,128 @@
+import hashlib
 import json
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Characters that may follow a complete array element
+_ELEMENT_END = ' \t\n\r,]'
+
+def normalize_food_item(item: Dict, index: int) -> Dict:
+    """Ensure a raw food item has the required fields and a derived taste profile"""
+    # Normalize food_id to string
+    if 'food_id' not in item:
+        item['food_id'] = str(index + 1)
+    else:
+        item['food_id'] = str(item['food_id'])
+
+    # Ensure required fields exist
+    if 'food_ingredients' not in item:
+        item['food_ingredients'] = []
+    if 'food_description' not in item:
+        item['food_description'] = ''
+    if 'cuisine_type' not in item:
+        item['cuisine_type'] = 'Unknown'
+    if 'food_calories_per_serving' not in item:
+        item['food_calories_per_serving'] = 0
+
+    # Extract taste features from nested food_features if available
+    if 'food_features' in item and isinstance(item['food_features'], dict):
+        taste_features = []
+        for key, value in item['food_features'].items():
+            if value:
+                taste_features.append(str(value))
+        item['taste_profile'] = ', '.join(taste_features)
+    else:
+        item['taste_profile'] = ''
+    return item
+
+def iter_json_array(file, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Decode the elements of a top-level JSON array one at a time
+
+    Only the current element and one read chunk are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    in_array = False
+    eof = False
+
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        at_end = position == len(buffer)
+
+        if not at_end:
+            char = buffer[position]
+            if not in_array:
+                if char != '[':
+                    raise ValueError("Expected a JSON array of food items")
+                in_array = True
+                position += 1
+                continue
+            if char == ']':
+                return
+            if char == ',':
+                position += 1
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                value, end = None, None
+            # A value is only complete once a delimiter follows it: at the buffer
+            # edge, or before a partial number such as "-0." or "12e", it may be
+            # truncated
+            if end is not None and (eof or (end < len(buffer) and buffer[end] in _ELEMENT_END)):
+                yield value
+                position = end
+                continue
+        elif eof:
+            raise ValueError("Unexpected end of JSON array")
+
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+def iter_json_lines(file) -> Iterator[Any]:
+    """Decode one JSON value per non-empty line"""
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def iter_food_data(file_path: str) -> Iterator[Dict]:
+    """Stream normalized food items from a JSON array or JSON Lines file"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        if file_path.endswith(JSON_LINES_EXTENSIONS):
+            raw_items = iter_json_lines(file)
+        else:
+            raw_items = iter_json_array(file)
+        for i, item in enumerate(raw_items):
+            yield normalize_food_item(item, i)
 
 def load_food_data(file_path: str) -> List[Dict]:
     """Load food data from JSON file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            food_data = json.load(file)
-        
-        # Ensure each item has required fields and normalize the structure
-        for i, item in enumerate(food_data):
-            # Normalize food_id to string
-            if 'food_id' not in item:
-                item['food_id'] = str(i + 1)
-            else:
-                item['food_id'] = str(item['food_id'])
-            
-            # Ensure required fields exist
-            if 'food_ingredients' not in item:
-                item['food_ingredients'] = []
-            if 'food_description' not in item:
-                item['food_description'] = ''
-            if 'cuisine_type' not in item:
-                item['cuisine_type'] = 'Unknown'
-            if 'food_calories_per_serving' not in item:
-                item['food_calories_per_serving'] = 0
-            
-            # Extract taste features from nested food_features if available
-            if 'food_features' in item and isinstance(item['food_features'], dict):
-                taste_features = []
-                for key, value in item['food_features'].items():
-                    if value:
-                        taste_features.append(str(value))
-                item['taste_profile'] = ', '.join(taste_features)
-            else:
-                item['taste_profile'] = ''
-        
+        food_data = list(iter_food_data(file_path))
         print(f"Successfully loaded {len(food_data)} food items from {file_path}")
         return food_data
-        
+
     except Exception as e:
         print(f"Error loading food data: {e}")
         return []
 
 
-def populate_similarity_collection(collection, food_items: List[Dict]):
-    """Populate collection with food data and generate embeddings"""
-    documents = []
-    metadatas = []
-    ids = []
-    
+def compute_content_hash(document: str, metadata: Dict) -> str:
+    """Hash the embedded document text together with its metadata"""
+    payload = json.dumps({"document": document, "metadata": metadata}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def iter_similarity_records(food_items: Iterable[Dict]) -> Iterator[Tuple[str, Dict, str]]:
+    """Yield (document, metadata, id) records for the collection, one food item at a time"""
     used_ids = set()
     
     for i, food in enumerate(food_items):
@@ -80,9 +154,7 @@ def populate_similarity_collection(collection, food_items: List[Dict]):
             counter += 1
         used_ids.add(unique_id)
         
-        documents.append(text)
-        ids.append(unique_id)
-        metadatas.append({
+        metadata = {
             "name": food["food_name"],
             "cuisine_type": food.get("cuisine_type", "Unknown"),
             "ingredients": ", ".join(food.get("food_ingredients", [])),
@@ -91,7 +163,23 @@ def populate_similarity_collection(collection, food_items: List[Dict]):
             "cooking_method": food.get("cooking_method", ""),
             "health_benefits": food.get("food_health_benefits", ""),
             "taste_profile": food.get("taste_profile", "")
-        })
-    
+        }
+        metadata["content_hash"] = compute_content_hash(text, metadata)
+
+        yield text, metadata, unique_id
+
+
+def populate_similarity_collection(collection, food_items: List[Dict]):
+    """Populate collection with food data and generate embeddings"""
+    documents = []
+    metadatas = []
+    ids = []
+
+    for document, metadata, doc_id in iter_similarity_records(food_items):
+        documents.append(document)
+        metadatas.append(metadata)
+        ids.append(doc_id)
+
     return documents, metadatas, ids
+
     
\ No newline at end of file
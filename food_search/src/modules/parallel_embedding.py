@@ -0,0 +1,56 @@
+import os
+from typing import List, Optional
+
+DEFAULT_ENCODE_BATCH_SIZE = 64
+
+
+class ParallelEmbeddingFunction:
+    """Sentence transformer embedding function backed by a pool of CPU worker processes
+
+    Documents are split into chunks, encoded by the workers and reassembled in
+    input order, so the returned embeddings line up with the ids they were sent
+    with. The pool is started on the first call; use it as a context manager so
+    the worker processes are shut down afterwards.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", workers: Optional[int] = None,
+                 batch_size: int = DEFAULT_ENCODE_BATCH_SIZE, chunk_size: Optional[int] = None):
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self._model = None
+        self._pool = None
+
+    def start(self):
+        """Load the model and spawn the worker processes"""
+        if self._pool is not None:
+            return self
+        from sentence_transformers import SentenceTransformer
+
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        self._model = SentenceTransformer(self.model_name, device="cpu")
+        self._pool = self._model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+        return self
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __call__(self, input: List[str]):
+        self.start()
+        embeddings = self._model.encode_multi_process(
+            list(input),
+            self._pool,
+            batch_size=self.batch_size,
+            chunk_size=self.chunk_size
+        )
+        return [embedding for embedding in embeddings]
@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Hashable
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries optionally expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+query_embedding_cache = TTLCache(maxsize=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "4096")))
+query_result_cache = TTLCache(
+    maxsize=int(os.getenv("QUERY_RESULT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("QUERY_RESULT_CACHE_TTL", "300"))
+)
+
+_collection_versions: Dict[str, int] = {}
+
+
+def collection_key(collection) -> str:
+    """Identify a collection across calls"""
+    return str(getattr(collection, "id", None) or collection.name)
+
+
+def collection_version(collection) -> int:
+    """Version counter bumped whenever this process modifies the collection"""
+    return _collection_versions.get(collection_key(collection), 0)
+
+
+def invalidate_collection(collection) -> None:
+    """Mark cached results for the collection as stale"""
+    key = collection_key(collection)
+    _collection_versions[key] = _collection_versions.get(key, 0) + 1
+
+
+def embed_queries(queries: List[str], embedding_function) -> List[Any]:
+    """Embed query texts, encoding only the ones not cached yet in a single call"""
+    embeddings = [query_embedding_cache.get(query) for query in queries]
+    missing = list(dict.fromkeys(q for q, e in zip(queries, embeddings) if e is None))
+    if missing:
+        computed = dict(zip(missing, embedding_function(missing)))
+        for query, embedding in computed.items():
+            query_embedding_cache.set(query, embedding)
+        embeddings = [e if e is not None else computed[q] for q, e in zip(queries, embeddings)]
+    return embeddings
+
+
+def split_query_results(results: Dict[str, Any], n_queries: int) -> List[Dict[str, Any]]:
+    """Split a multi-query ChromaDB result into one single-query result per query"""
+    per_query = []
+    for i in range(n_queries):
+        single = {}
+        for key, value in results.items():
+            if key != "included" and isinstance(value, list) and len(value) == n_queries:
+                single[key] = [value[i]]
+            else:
+                single[key] = value
+        per_query.append(single)
+    return per_query
+
+
+def cached_query_batch(collection, queries: List[str], n_results: int, where: Optional[Dict] = None,
+                       embedding_function=None) -> List[Dict[str, Any]]:
+    """Query the collection for many texts at once, reusing results for identical recent queries
+
+    Uncached queries are embedded in one encoder pass and sent in one query call.
+    """
+    version = collection_version(collection)
+    where_key = json.dumps(where, sort_keys=True)
+    keys = [(collection_key(collection), version, query, n_results, where_key) for query in queries]
+    results = [query_result_cache.get(key) for key in keys]
+
+    missing = list(dict.fromkeys(q for q, r in zip(queries, results) if r is None))
+    if missing:
+        if embedding_function is not None:
+            batch_results = collection.query(
+                query_embeddings=embed_queries(missing, embedding_function),
+                n_results=n_results,
+                where=where
+            )
+        else:
+            batch_results = collection.query(query_texts=missing, n_results=n_results, where=where)
+
+        fetched = dict(zip(missing, split_query_results(batch_results, len(missing))))
+        for key, query in zip(keys, queries):
+            if query in fetched:
+                query_result_cache.set(key, fetched[query])
+        results = [r if r is not None else fetched[q] for q, r in zip(queries, results)]
+
+    return results
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters for the query embedding and result caches"""
+    return {
+        "query_embeddings": query_embedding_cache.stats(),
+        "query_results": query_result_cache.stats(),
+    }
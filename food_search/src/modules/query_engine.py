@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+from modules.create_chroma import get_embedding_function
+from modules.query_cache import cached_query_batch, cache_stats
+from modules.search_results import SearchResults
+
+_stats_lock = threading.Lock()
+_query_stats = {"calls": 0, "queries": 0, "total_seconds": 0.0, "last_seconds": 0.0}
+
+
+def build_where_clause(cuisine_filter: Optional[str] = None,
+                       max_calories: Optional[int] = None,
+                       min_calories: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Build a ChromaDB where clause from the supported food filters"""
+    filters = []
+    if cuisine_filter:
+        filters.append({"cuisine_type": cuisine_filter})
+    if max_calories:
+        filters.append({"calories": {"$lte": max_calories}})
+    if min_calories:
+        filters.append({"calories": {"$gte": min_calories}})
+
+    if len(filters) == 1:
+        return filters[0]
+    if len(filters) > 1:
+        return {"$and": filters}
+    return None
+
+
+def _record_timing(n_queries: int, seconds: float) -> None:
+    with _stats_lock:
+        _query_stats["calls"] += 1
+        _query_stats["queries"] += n_queries
+        _query_stats["total_seconds"] += seconds
+        _query_stats["last_seconds"] = seconds
+
+
+def run_queries(collection, queries: List[str], n_results: int = 5,
+                where: Optional[Dict[str, Any]] = None) -> List[SearchResults]:
+    """Single code path for every food search: cache lookup, query execution, formatting and timing"""
+    if not queries:
+        return []
+    started = time.perf_counter()
+    try:
+        results = cached_query_batch(
+            collection, queries, n_results,
+            where=where,
+            embedding_function=get_embedding_function()
+        )
+        return [SearchResults.from_query_result(query_results) for query_results in results]
+    finally:
+        _record_timing(len(queries), time.perf_counter() - started)
+
+
+def perform_similarity_search(collection, query: str, n_results: int = 5) -> SearchResults:
+    """Perform similarity search and return formatted results"""
+    try:
+        return run_queries(collection, [query], n_results)[0]
+    except Exception as e:
+        print(f"Error in similarity search: {e}")
+        return SearchResults([], [], [])
+
+
+def perform_filtered_similarity_search(collection, query: str, cuisine_filter: str = None,
+                                       max_calories: int = None, n_results: int = 5,
+                                       min_calories: int = None) -> SearchResults:
+    """Perform filtered similarity search with metadata constraints"""
+    try:
+        where_clause = build_where_clause(cuisine_filter, max_calories, min_calories)
+        return run_queries(collection, [query], n_results, where_clause)[0]
+    except Exception as e:
+        print(f"Error in filtered search: {e}")
+        return SearchResults([], [], [])
+
+
+def perform_similarity_search_batch(collection, queries: List[str], n_results: int = 5,
+                                    filters: Optional[Dict] = None) -> List[SearchResults]:
+    """Search for several queries in one encoder pass and one query call
+
+    Returns one result set per query, in the order of ``queries``.
+    ``filters`` is an optional ChromaDB where clause applied to every query.
+    """
+    try:
+        return run_queries(collection, queries, n_results, filters)
+    except Exception as e:
+        print(f"Error in batch similarity search: {e}")
+        return [SearchResults([], [], []) for _ in queries]
+
+
+def query_engine_stats() -> Dict[str, Any]:
+    """Query timing totals together with the cache hit/miss counters"""
+    with _stats_lock:
+        stats = dict(_query_stats)
+    stats["avg_seconds"] = stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0
+    stats["caches"] = cache_stats()
+    return stats
@@ -0,0 +1,167 @@
+import functools
+import re
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+from modules.query_engine import build_where_clause
+
+# Cuisine values present in the food dataset's ``cuisine_type`` metadata
+CUISINES = (
+    "International", "American", "Italian", "French", "Indian", "Thai", "German",
+    "Middle Eastern", "British", "Latin American", "Mexican", "Japanese", "Chinese",
+    "Australian", "Southern", "Spanish", "Korean", "Greek", "Canadian",
+)
+
+# Other ways users name a cuisine
+CUISINE_ALIASES = {
+    "middle-eastern": "Middle Eastern", "lebanese": "Middle Eastern", "turkish": "Middle Eastern",
+    "persian": "Middle Eastern", "latin": "Latin American", "latino": "Latin American",
+    "aussie": "Australian", "soul food": "Southern",
+}
+
+# Places whose food is a cuisine of the dataset, as in "food from Greece"
+COUNTRY_CUISINES = {
+    "italy": "Italian", "france": "French", "india": "Indian", "thailand": "Thai",
+    "germany": "German", "middle east": "Middle Eastern", "uk": "British", "mexico": "Mexican",
+    "japan": "Japanese", "china": "Chinese", "australia": "Australian", "spain": "Spanish",
+    "korea": "Korean", "greece": "Greek", "canada": "Canadian",
+}
+
+# Calorie ceiling used for "low calorie" / "low-cal"
+LOW_CALORIE_MAX = 400
+
+_CUISINE_LOOKUP = {name.lower(): name for name in CUISINES}
+_CUISINE_LOOKUP.update(CUISINE_ALIASES)
+_CUISINE_LOOKUP.update(COUNTRY_CUISINES)
+
+
+def _alternatives(names) -> str:
+    # Longest names first so "Latin American" wins over "American"
+    return "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+
+
+_CUISINE_NAMES = _alternatives(_CUISINE_LOOKUP)
+_COUNTRY_NAMES = _alternatives(COUNTRY_CUISINES)
+# A cuisine only becomes a filter in constraint position ("Italian dishes",
+# "food from Greece"); in "French toast" or "Greek yogurt" it names the dish
+# and is left to the embedding. After "in"/"from" only a place counts, so
+# "recipes in English please" stays plain text.
+_CUISINE_PATTERNS = (
+    re.compile(r"\b(" + _CUISINE_NAMES + r")\s+(?:dish(?:es)?|foods?|cuisine|meals?|recipes?|cooking|style)\b",
+               re.IGNORECASE),
+    re.compile(r"\b(?:from|in)\s+(?:the\s+)?(" + _COUNTRY_NAMES + r")\b", re.IGNORECASE),
+)
+
+_CALORIES = r"\s*(?:k?cals?|kcal|calories?)\b"
+_NUMBER = r"(\d{2,5})"
+_BETWEEN_PATTERN = re.compile(
+    r"\b(?:between|from)\s+" + _NUMBER + r"\s*(?:and|to|-)\s*" + _NUMBER + _CALORIES, re.IGNORECASE
+)
+_MAX_PATTERNS = (
+    re.compile(r"(?:\b(?:under|below|less than|fewer than|at most|up to|no more than|max(?:imum)?|within)\s+|<=?\s*)"
+               + _NUMBER + _CALORIES, re.IGNORECASE),
+    re.compile(r"\b" + _NUMBER + _CALORIES + r"\s+(?:or less|or fewer|max(?:imum)?|or under)\b", re.IGNORECASE),
+)
+_MIN_PATTERNS = (
+    re.compile(r"(?:\b(?:over|above|more than|at least|min(?:imum)?)\s+|>=?\s*)" + _NUMBER + _CALORIES,
+               re.IGNORECASE),
+    re.compile(r"\b" + _NUMBER + _CALORIES + r"\s+(?:or more|plus|minimum)\b", re.IGNORECASE),
+)
+_LOW_CALORIE_PATTERN = re.compile(r"\blow[\s-]?cal(?:orie)?s?\b", re.IGNORECASE)
+# Connectives left behind once the calorie phrases are cut out
+_EDGE_CONNECTIVES_PATTERN = re.compile(
+    r"^(?:(?:and|or|but|with)\b|[\s,])+|(?:\b(?:and|or|but|with)|[\s,])+$", re.IGNORECASE
+)
+_REPEATED_CONNECTIVES_PATTERN = re.compile(r"\b(and|or|but|with)(?:[\s,]+(?:and|or|but|with)\b)+",
+                                           re.IGNORECASE)
+_COMMAS_PATTERN = re.compile(r"\s*(?:,\s*)+")
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """A food query split into its semantic text and the metadata filters it names"""
+    text: str
+    cuisine: Optional[str] = None
+    max_calories: Optional[int] = None
+    min_calories: Optional[int] = None
+
+    @property
+    def has_filters(self) -> bool:
+        return bool(self.cuisine or self.max_calories or self.min_calories)
+
+    def where(self) -> Optional[Dict[str, Any]]:
+        return build_where_clause(self.cuisine, self.max_calories, self.min_calories)
+
+    def describe(self) -> str:
+        parts = []
+        if self.cuisine:
+            parts.append(f"{self.cuisine} cuisine")
+        if self.min_calories and self.max_calories:
+            parts.append(f"{self.min_calories}-{self.max_calories} cal")
+        elif self.max_calories:
+            parts.append(f"≤ {self.max_calories} cal")
+        elif self.min_calories:
+            parts.append(f"≥ {self.min_calories} cal")
+        return ", ".join(parts)
+
+
+def _strip(text: str, match: re.Match) -> str:
+    return text[:match.start()] + " " + text[match.end():]
+
+
+def _clean(text: str) -> str:
+    text = _COMMAS_PATTERN.sub(", ", " ".join(text.split())).strip(" ,.-")
+    text = _REPEATED_CONNECTIVES_PATTERN.sub(r"\1", text)
+    return _EDGE_CONNECTIVES_PATTERN.sub("", text).strip(" ,.-")
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_query(query: str) -> ParsedQuery:
+    """Extract cuisine and calorie constraints with precompiled patterns
+
+    Calorie phrases are removed from the semantic text since numbers only add
+    noise to the embedding, along with connectives they leave dangling. The
+    cuisine word is kept as it still describes the dish, and is only used as a
+    filter where it reads as a constraint.
+    """
+    text = query
+    max_calories = min_calories = None
+
+    match = _BETWEEN_PATTERN.search(text)
+    if match:
+        low, high = sorted((int(match.group(1)), int(match.group(2))))
+        min_calories, max_calories = low, high
+        text = _strip(text, match)
+    else:
+        for pattern in _MAX_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                max_calories = int(match.group(1))
+                text = _strip(text, match)
+                break
+        for pattern in _MIN_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                min_calories = int(match.group(1))
+                text = _strip(text, match)
+                break
+        if max_calories is None and min_calories is None:
+            match = _LOW_CALORIE_PATTERN.search(text)
+            if match:
+                max_calories = LOW_CALORIE_MAX
+
+    cuisine = None
+    for pattern in _CUISINE_PATTERNS:
+        match = pattern.search(query)
+        if match:
+            cuisine = _CUISINE_LOOKUP[match.group(1).lower()]
+            break
+
+    text = _clean(text) or query
+    return ParsedQuery(text=text, cuisine=cuisine, max_calories=max_calories, min_calories=min_calories)
+
+
+def retrieval_text(query: str) -> str:
+    """The text retrieval embeds for ``query``: the semantic part when it names filters"""
+    parsed = parse_query(query)
+    return parsed.text if parsed.has_filters else query
@@ -0,0 +1,121 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from modules.create_chroma import get_embedding_function
+from modules.query_cache import embed_queries
+from modules.query_parser import parse_query, retrieval_text
+
+
+class SemanticResponseCache:
+    """Reuse LLM answers for near-identical queries that retrieved the same foods
+
+    An entry matches when the model, the filters and the retrieved food ids are
+    identical and the cosine similarity between query embeddings is at least ``threshold``.
+    Entries expire after ``ttl`` seconds and the least recently used one is
+    evicted once ``maxsize`` is reached.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl: Optional[float] = 600, maxsize: int = 256):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._buckets: Dict[Tuple, List[int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remove(self, entry_id: int) -> None:
+        bucket_key, _, _, _ = self._entries.pop(entry_id)
+        bucket = self._buckets[bucket_key]
+        bucket.remove(entry_id)
+        if not bucket:
+            del self._buckets[bucket_key]
+
+    def lookup(self, query_embedding, food_ids: List[str], model: str, filters: str = "") -> Optional[str]:
+        """Return a cached response for a similar query over the same foods, if any"""
+        bucket_key = (model, filters, tuple(food_ids))
+        vector = self._normalize(query_embedding)
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self._buckets.get(bucket_key, [])):
+                _, entry_vector, _, expires_at = self._entries[entry_id]
+                if expires_at is not None and expires_at <= now:
+                    self._remove(entry_id)
+                    self.expirations += 1
+                    continue
+                score = float(np.dot(vector, entry_vector))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id][2]
+
+    def store(self, query_embedding, food_ids: List[str], model: str, response: str, filters: str = "") -> None:
+        bucket_key = (model, filters, tuple(food_ids))
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        entry_id = next(self._ids)
+        with self._lock:
+            self._entries[entry_id] = (bucket_key, self._normalize(query_embedding), response, expires_at)
+            self._buckets.setdefault(bucket_key, []).append(entry_id)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+response_cache = SemanticResponseCache(
+    threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.95")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "600")),
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+)
+
+
+def response_cache_key(query: str, search_results) -> Tuple[Any, List[str], str]:
+    """Query embedding, the ids of the foods placed in the prompt and the query's filters
+
+    The embedding is of the exact text retrieval searched with, so it comes from
+    the query embedding cache rather than a second encoder call. Calorie numbers
+    are not part of that text, hence the filters in the key.
+    """
+    query_embedding = embed_queries([retrieval_text(query)], get_embedding_function())[0]
+    food_ids = [result['food_id'] for result in search_results[:3]]
+    return query_embedding, food_ids, parse_query(query).describe()
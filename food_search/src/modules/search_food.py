@@ -1,57 +1,5 @@
 from typing import List, Dict, Any, Optional
-from modules.create_chroma import initiate_food_collection
-from modules.create_basic import perform_similarity_search
-
-def perform_filtered_similarity_search(collection, query: str, cuisine_filter: str = None, 
-
-                                     max_calories: int = None, n_results: int = 5) -> List[Dict]:
-    """Perform filtered similarity search with metadata constraints"""
-    where_clause = None
-    
-    # Build filters list
-    filters = []
-    if cuisine_filter:
-        filters.append({"cuisine_type": cuisine_filter})
-    
-    if max_calories:
-        filters.append({"calories": {"$lte": max_calories}})
-    
-    # Construct where clause based on number of filters
-    if len(filters) == 1:
-        where_clause = filters[0]
-    elif len(filters) > 1:
-        where_clause = {"$and": filters}
-    
-    try:
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where=where_clause
-        )
-        
-        if not results or not results['ids'] or len(results['ids'][0]) == 0:
-            return []
-        
-        formatted_results = []
-        for i in range(len(results['ids'][0])):
-            similarity_score = 1 - results['distances'][0][i]
-            
-            result = {
-                'food_id': results['ids'][0][i],
-                'food_name': results['metadatas'][0][i]['name'],
-                'food_description': results['metadatas'][0][i]['description'],
-                'cuisine_type': results['metadatas'][0][i]['cuisine_type'],
-                'food_calories_per_serving': results['metadatas'][0][i]['calories'],
-                'similarity_score': similarity_score,
-                'distance': results['distances'][0][i]
-            }
-            formatted_results.append(result)
-        
-        return formatted_results
-        
-    except Exception as e:
-        print(f"Error in filtered search: {e}")
-        return []
+from modules.query_engine import perform_similarity_search, perform_filtered_similarity_search
 
 def interactive_food_chatbot(collection):
     """Interactive CLI chatbot for food recommendations"""
@@ -101,14 +49,14 @@ def suggest_related_searches(results):
         return
     
     # Extract cuisine types from results
-    cuisines = list(set([r['cuisine_type'] for r in results]))
+    cuisines = list(set(results.column('cuisine_type')))
     
     print("\n💡 Related searches you might like:")
     for cuisine in cuisines[:3]:  # Limit to 3 suggestions
         print(f"   • Try '{cuisine} dishes' for more {cuisine} options")
     
     # Suggest calorie-based searches
-    avg_calories = sum([r['food_calories_per_serving'] for r in results]) / len(results)
+    avg_calories = sum(results.column('food_calories_per_serving')) / len(results)
     if avg_calories > 350:
         print("   • Try 'low calorie' for lighter options")
     else:
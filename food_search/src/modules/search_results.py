@@ -0,0 +1,71 @@
+from collections.abc import Sequence
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+# Result dict keys and the collection metadata fields they come from
+RESULT_FIELDS = {
+    'food_name': 'name',
+    'food_description': 'description',
+    'cuisine_type': 'cuisine_type',
+    'food_calories_per_serving': 'calories',
+}
+
+
+class SearchResults(Sequence):
+    """Columnar results of one similarity query
+
+    Distances and similarity scores are NumPy arrays; the per-hit dicts that
+    callers index into are only built when a row is accessed.
+    """
+
+    __slots__ = ('ids', 'distances', 'similarity_scores', 'metadatas')
+
+    def __init__(self, ids: List[str], distances, metadatas: List[Dict[str, Any]]):
+        self.ids = list(ids)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        self.similarity_scores = 1.0 - self.distances
+        self.metadatas = list(metadatas)
+
+    @classmethod
+    def from_query_result(cls, results: Optional[Dict[str, Any]], index: int = 0) -> "SearchResults":
+        """Build from the ``index``-th query of a ChromaDB query result"""
+        if not results or not results['ids'] or len(results['ids'][index]) == 0:
+            return cls([], [], [])
+        return cls(results['ids'][index], results['distances'][index], results['metadatas'][index])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SearchResults(self.ids[index], self.distances[index], self.metadatas[index])
+        return self.row(index)
+
+    def __repr__(self) -> str:
+        return f"SearchResults(ids={self.ids!r})"
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Materialize one hit as the food result dict used by the CLI and LLM context"""
+        metadata = self.metadatas[index]
+        result = {'food_id': self.ids[index]}
+        for key, field in RESULT_FIELDS.items():
+            result[key] = metadata[field]
+        result['similarity_score'] = float(self.similarity_scores[index])
+        result['distance'] = float(self.distances[index])
+        return result
+
+    def column(self, key: str) -> List[Any]:
+        """Return one result field for every hit without building row dicts"""
+        if key == 'food_id':
+            return list(self.ids)
+        if key == 'similarity_score':
+            return self.similarity_scores.tolist()
+        if key == 'distance':
+            return self.distances.tolist()
+        field = RESULT_FIELDS.get(key, key)
+        return [metadata.get(field) for metadata in self.metadatas]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialize every hit as a dict"""
+        return [self.row(i) for i in range(len(self))]
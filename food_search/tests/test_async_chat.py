@@ -0,0 +1,107 @@
+import asyncio
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from anthropic import AsyncAnthropic
+
+from modules import llm_client
+from modules.async_chat import read_input, stream_response
+from modules.fake_llm_server import FakeLLMServer, fake_reply
+
+
+def test_stream_response_through_async_anthropic(monkeypatch):
+    prompt = "Recommend a spicy Thai curry under 500 calories"
+    tokens = []
+
+    async def stream(base_url):
+        client = AsyncAnthropic(base_url=base_url, api_key="test-key", max_retries=0)
+        monkeypatch.setattr(llm_client, "_async_client", client)
+        try:
+            return await stream_response(prompt, on_text=tokens.append)
+        finally:
+            await client.close()
+
+    with FakeLLMServer(token_delay=0.001) as server:
+        response = asyncio.run(stream(server.base_url))
+
+    assert len(tokens) > 1
+    assert response == "".join(tokens)
+    assert response.strip() == fake_reply({"messages": [{"role": "user", "content": prompt}]})
+
+
+def test_read_input_returns_the_line_and_propagates_eof():
+    def end_of_input():
+        raise EOFError
+
+    assert asyncio.run(read_input(lambda prompt: f"{prompt}pasta", "> ")) == "> pasta"
+    with pytest.raises(EOFError):
+        asyncio.run(read_input(end_of_input))
+
+
+def test_pending_read_does_not_hold_up_shutdown():
+    release = threading.Event()
+
+    async def abandon_prompt():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(read_input(release.wait), 0.1)
+
+    started = time.monotonic()
+    asyncio.run(abandon_prompt())
+    try:
+        assert time.monotonic() - started < 2
+    finally:
+        release.set()
+
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+CHAT_SCRIPT = "import asyncio; from modules.async_chat import start_async_chat; asyncio.run(start_async_chat(None))"
+piped_stdin_only = pytest.mark.skipif(os.name != "posix", reason="reads piped stdin with loop.add_reader")
+
+
+def spawn_chat():
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    return subprocess.Popen([sys.executable, "-c", CHAT_SCRIPT], cwd=SRC, env=env, stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def read_until(stream, marker: bytes, timeout: float = 30) -> bytes:
+    output = b""
+    deadline = time.monotonic() + timeout
+    while marker not in output:
+        remaining = deadline - time.monotonic()
+        assert remaining > 0, f"no {marker!r} in {output!r}"
+        if select.select([stream], [], [], remaining)[0]:
+            chunk = os.read(stream.fileno(), 4096)
+            assert chunk, f"exited before {marker!r}: {output!r}"
+            output += chunk
+    return output
+
+
+@piped_stdin_only
+def test_piped_lines_are_read_until_quit():
+    chat = spawn_chat()
+    output, errors = chat.communicate(b"\nhelp\nquit\n", timeout=30)
+
+    assert chat.returncode == 0, errors.decode()
+    assert "Please tell me what kind of food" in output.decode()
+    assert "Thank you for using" in output.decode()
+
+
+@piped_stdin_only
+def test_ctrl_c_at_a_piped_prompt_exits_cleanly():
+    chat = spawn_chat()
+    try:
+        read_until(chat.stdout, "You: ".encode())
+        chat.send_signal(signal.SIGINT)
+        output, errors = chat.communicate(timeout=30)
+    finally:
+        chat.kill()
+
+    assert chat.returncode == 0, errors.decode()
+    assert "Goodbye" in output.decode()
@@ -0,0 +1,37 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from modules.embedding_cache import EmbeddingCache  # noqa: E402
+
+
+def test_round_trip_across_instances(tmp_path):
+    cache = EmbeddingCache("test-model", str(tmp_path))
+    cache.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    reopened = EmbeddingCache("test-model", str(tmp_path))
+    a, missing, b = reopened.get_many(["a", "missing", "b"])
+    assert missing is None
+    assert a.tolist() == [1.0, 2.0]
+    assert b.tolist() == [3.0, 4.0]
+
+
+def test_append_after_torn_write_stays_row_aligned(tmp_path):
+    cache = EmbeddingCache("test-model", str(tmp_path))
+    cache.put_many(["a"], [[1.0, 2.0]])
+    # A writer killed mid-row leaves a partial vector behind
+    with open(cache.vectors_path, "ab") as vectors_file:
+        vectors_file.write(b"\x00\x01\x02")
+
+    cache.put_many(["b"], [[3.0, 4.0]])
+
+    reopened = EmbeddingCache("test-model", str(tmp_path))
+    assert len(reopened) == 2
+    assert [vector.tolist() for vector in reopened.get_many(["a", "b"])] == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_rejects_a_different_dimension(tmp_path):
+    cache = EmbeddingCache("test-model", str(tmp_path))
+    cache.put_many(["a"], [[1.0, 2.0]])
+    with pytest.raises(ValueError):
+        cache.put_many(["b"], [[1.0, 2.0, 3.0]])
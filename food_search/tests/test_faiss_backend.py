@@ -0,0 +1,133 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from modules import faiss_backend  # noqa: E402
+from modules.faiss_backend import FaissCollection, create_faiss_collection, open_faiss_collection  # noqa: E402
+
+DIMENSION = 8
+INDEX_TYPES = ["flat", "hnsw", "ivf-flat"]
+
+
+def unit(i, dimension=DIMENSION):
+    vector = np.full(dimension, 0.01, dtype=np.float32)
+    vector[i] = 1.0
+    return vector
+
+
+def add_foods(collection, count=6):
+    collection.add(
+        ids=[f"food-{i}" for i in range(count)],
+        documents=[f"dish {i}" for i in range(count)],
+        metadatas=[{"cuisine_type": "Thai" if i % 2 else "Italian", "calories": 100 * (i + 1)}
+                   for i in range(count)],
+        embeddings=[unit(i) for i in range(count)],
+    )
+
+
+def top_ids(collection, i, n_results=1, where=None):
+    return collection.query(query_embeddings=[unit(i)], n_results=n_results, where=where)["ids"][0]
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_add_get_query(index_type):
+    collection = FaissCollection("foods", index_type=index_type)
+    add_foods(collection)
+
+    assert collection.count() == 6
+    assert collection.get(ids=["food-3"])["documents"] == ["dish 3"]
+    assert collection.get(where={"calories": {"$lte": 200}})["ids"] == ["food-0", "food-1"]
+    for i in range(6):
+        assert top_ids(collection, i) == [f"food-{i}"]
+
+    result = collection.query(query_embeddings=[unit(2)], n_results=1, include=["distances"])
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_query_with_where_only_returns_matches(index_type):
+    collection = FaissCollection("foods", index_type=index_type)
+    add_foods(collection)
+
+    hits = top_ids(collection, 0, n_results=6, where={"cuisine_type": "Thai"})
+    assert sorted(hits) == ["food-1", "food-3", "food-5"]
+    assert top_ids(collection, 0, where={"cuisine_type": "Korean"}) == []
+
+
+def test_add_rejects_existing_ids():
+    collection = FaissCollection("foods", index_type="flat")
+    add_foods(collection)
+    with pytest.raises(ValueError):
+        collection.add(ids=["food-1"], documents=["again"], embeddings=[unit(1)])
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_upsert_replaces_document_and_vector(index_type):
+    collection = FaissCollection("foods", index_type=index_type)
+    add_foods(collection)
+    collection.upsert(ids=["food-1", "food-9"], documents=["new dish 1", "dish 9"],
+                      metadatas=[{"cuisine_type": "Greek"}, {"cuisine_type": "Greek"}],
+                      embeddings=[unit(7), unit(6)])
+
+    assert collection.count() == 7
+    assert collection.get(ids=["food-1"])["documents"] == ["new dish 1"]
+    assert collection.get(ids=["food-1"])["metadatas"] == [{"cuisine_type": "Greek"}]
+    assert top_ids(collection, 7) == ["food-1"]
+    assert "food-1" not in top_ids(collection, 1, n_results=7, where={"cuisine_type": "Thai"})
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_delete_by_ids_and_where(index_type):
+    collection = FaissCollection("foods", index_type=index_type)
+    add_foods(collection)
+    collection.delete(ids=["food-0"])
+    collection.delete(where={"cuisine_type": "Thai"})
+
+    assert collection.count() == 2
+    assert collection.get()["ids"] == ["food-2", "food-4"]
+    assert sorted(top_ids(collection, 0, n_results=6)) == ["food-2", "food-4"]
+
+
+def test_hnsw_compacts_once_tombstones_pass_the_ratio(monkeypatch):
+    monkeypatch.setattr(faiss_backend, "HNSW_COMPACT_RATIO", 0.5)
+    collection = FaissCollection("foods", index_type="hnsw")
+    add_foods(collection)
+
+    collection.delete(ids=["food-0", "food-1"])
+    assert collection._index.ntotal == 6
+    collection.delete(ids=["food-2", "food-3"])
+    assert collection._index.ntotal == 2
+    assert top_ids(collection, 5, n_results=6) == ["food-5", "food-4"]
+
+    collection.upsert(ids=["food-4"], documents=["dish 4"], embeddings=[unit(4)])
+    collection.compact()
+    assert collection._index.ntotal == collection.count() == 2
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_persist_and_reopen(tmp_path, index_type):
+    collection = create_faiss_collection("foods", {"dataset_fingerprint": "abc"}, str(tmp_path), index_type)
+    add_foods(collection)
+    collection.delete(ids=["food-5"])
+    collection.persist()
+
+    reopened = open_faiss_collection(str(tmp_path), "foods", index_type)
+    assert reopened.metadata == {"dataset_fingerprint": "abc"}
+    assert reopened.count() == 5
+    assert reopened.get(ids=["food-2"])["metadatas"] == [{"cuisine_type": "Italian", "calories": 300}]
+    assert top_ids(reopened, 3) == ["food-3"]
+    other_type = "flat" if index_type != "flat" else "hnsw"
+    assert open_faiss_collection(str(tmp_path), "foods", other_type) is None
+
+    reopened.add(ids=["food-6"], documents=["dish 6"], embeddings=[unit(6)])
+    assert top_ids(reopened, 6) == ["food-6"]
+
+
+def test_unpersisted_changes_are_not_reopened(tmp_path):
+    collection = create_faiss_collection("foods", None, str(tmp_path), "flat")
+    add_foods(collection)
+    collection.persist()
+    collection.delete(ids=["food-0"])
+
+    assert open_faiss_collection(str(tmp_path), "foods", "flat") is None
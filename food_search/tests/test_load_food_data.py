@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+from modules.load_food_data import iter_food_data, iter_json_array
+
+ITEMS = [
+    {"food_id": 1, "food_name": "Pad Thai", "food_ingredients": ["rice noodles", "peanuts"]},
+    {"food_id": 2, "food_description": "brackets ] and [ commas , inside \"strings\"", "nested": {"a": [1, {"b": []}]}},
+    12345,
+    -0.5e3,
+    "café ☕",
+    None,
+    True,
+    [],
+    {},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 16, 64, 1 << 16])
+def test_chunk_boundaries_anywhere(chunk_size):
+    text = json.dumps(ITEMS, indent=2, ensure_ascii=False)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == ITEMS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5])
+def test_number_ending_at_a_chunk_edge_is_not_truncated(chunk_size):
+    text = "[1,23,456,7890,-0.5,1.25e-3,12E+2]"
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ ]  ", "\n[\n]\n"])
+def test_empty_array(text):
+    assert list(iter_json_array(io.StringIO(text), 1)) == []
+
+
+@pytest.mark.parametrize("text", ['{"food_id": 1}', '[{"food_id": 1},', '[{"food_id": 1', ""])
+def test_malformed_input_raises(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), 4))
+
+
+def test_items_are_yielded_before_the_array_is_read():
+    class Source(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            Source.reads += 1
+            return super().read(size)
+
+    source = Source(json.dumps([{"food_id": i} for i in range(100)]))
+    first = next(iter_json_array(source, 32))
+    assert first == {"food_id": 0}
+    assert Source.reads < 5
+
+
+def test_iter_food_data_reads_arrays_and_json_lines(tmp_path):
+    items = [{"food_id": 7, "food_name": "Soup"}, {"food_name": "Salad", "food_features": {"taste": "fresh"}}]
+    array_path = tmp_path / "foods.json"
+    array_path.write_text(json.dumps(items), encoding="utf-8")
+    lines_path = tmp_path / "foods.jsonl"
+    lines_path.write_text("\n".join(json.dumps(item) for item in items) + "\n\n", encoding="utf-8")
+
+    for path in (array_path, lines_path):
+        foods = list(iter_food_data(str(path)))
+        assert [food["food_id"] for food in foods] == ["7", "2"]
+        assert foods[1]["taste_profile"] == "fresh"
+        assert foods[1]["cuisine_type"] == "Unknown"
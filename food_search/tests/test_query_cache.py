@@ -0,0 +1,107 @@
+import pytest
+
+from modules import query_cache
+from modules.query_cache import TTLCache, cached_query_batch, invalidate_collection, query_result_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeCollection:
+    """Answers query() with one hit per query text and records every call"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=10, where=None):
+        self.calls.append(list(query_texts))
+        return {
+            "ids": [[f"{text}-{len(self.calls)}"] for text in query_texts],
+            "distances": [[0.0] for _ in query_texts],
+            "included": ["distances"],
+        }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache, "time", clock)
+    query_result_cache.clear()
+    yield clock
+    query_result_cache.clear()
+
+
+def test_ttl_expiry(clock):
+    cache = TTLCache(maxsize=8, ttl=10)
+    cache.set("pasta", 1)
+    clock.now += 9.9
+    assert cache.get("pasta") == 1
+    clock.now += 0.2
+    assert cache.get("pasta") is None
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_no_ttl_never_expires(clock):
+    cache = TTLCache(maxsize=8)
+    cache.set("pasta", 1)
+    clock.now += 1e9
+    assert cache.get("pasta") == 1
+
+
+def test_lru_eviction(clock):
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_repeated_queries_are_served_from_the_cache(clock):
+    collection = FakeCollection("foods-repeat")
+    first = cached_query_batch(collection, ["curry", "soup", "curry"], n_results=1)
+    second = cached_query_batch(collection, ["soup", "curry"], n_results=1)
+
+    assert collection.calls == [["curry", "soup"]]
+    assert [result["ids"] for result in first] == [[["curry-1"]], [["soup-1"]], [["curry-1"]]]
+    assert second == [first[1], first[0]]
+
+
+def test_cached_results_are_keyed_by_filter_and_size(clock):
+    collection = FakeCollection("foods-keys")
+    cached_query_batch(collection, ["curry"], n_results=1)
+    cached_query_batch(collection, ["curry"], n_results=2)
+    cached_query_batch(collection, ["curry"], n_results=1, where={"cuisine_type": "Thai"})
+    assert len(collection.calls) == 3
+
+
+def test_results_expire_after_the_ttl(clock):
+    collection = FakeCollection("foods-ttl")
+    cached_query_batch(collection, ["curry"], n_results=1)
+    clock.now += query_result_cache.ttl + 1
+    result = cached_query_batch(collection, ["curry"], n_results=1)
+    assert len(collection.calls) == 2
+    assert result[0]["ids"] == [["curry-2"]]
+
+
+def test_invalidating_the_collection_bypasses_cached_results(clock):
+    collection = FakeCollection("foods-version")
+    other = FakeCollection("foods-untouched")
+    cached_query_batch(collection, ["curry"], n_results=1)
+    cached_query_batch(other, ["curry"], n_results=1)
+
+    invalidate_collection(collection)
+    result = cached_query_batch(collection, ["curry"], n_results=1)
+    cached_query_batch(other, ["curry"], n_results=1)
+
+    assert len(collection.calls) == 2
+    assert result[0]["ids"] == [["curry-2"]]
+    assert len(other.calls) == 1
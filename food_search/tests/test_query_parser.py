@@ -0,0 +1,59 @@
+import pytest
+
+from modules.query_parser import LOW_CALORIE_MAX, parse_query, retrieval_text
+
+
+@pytest.mark.parametrize("query", ["French toast", "Greek yogurt", "Thai curry", "american cheese burger"])
+def test_cuisine_naming_the_dish_is_not_a_filter(query):
+    parsed = parse_query(query)
+    assert parsed.cuisine is None
+    assert parsed.text == query
+    assert not parsed.has_filters
+
+
+@pytest.mark.parametrize("query", ["recipes in english please", "curry in Thai", "noodles from Korean friends"])
+def test_in_or_from_a_cuisine_adjective_is_not_a_filter(query):
+    parsed = parse_query(query)
+    assert parsed.cuisine is None
+    assert parsed.text == query
+
+
+@pytest.mark.parametrize("query, cuisine", [
+    ("French food", "French"),
+    ("spicy Indian dishes", "Indian"),
+    ("middle eastern cuisine", "Middle Eastern"),
+    ("something sweet from Greece", "Greek"),
+    ("noodles from Latin American cooking", "Latin American"),
+    ("comfort food in the UK", "British"),
+])
+def test_cuisine_in_constraint_position_is_a_filter(query, cuisine):
+    parsed = parse_query(query)
+    assert parsed.cuisine == cuisine
+    assert parsed.where() == {"cuisine_type": cuisine}
+
+
+@pytest.mark.parametrize("query, text", [
+    ("pasta under 400 cals and over 200 calories", "pasta"),
+    ("chicken with under 300 kcal and rice", "chicken with rice"),
+    ("fish, under 300 calories, and grilled", "fish, and grilled"),
+    ("salad between 200 and 400 calories", "salad"),
+])
+def test_calorie_phrases_leave_no_dangling_connectives(query, text):
+    assert parse_query(query).text == text
+
+
+def test_calorie_bounds():
+    parsed = parse_query("pasta under 400 cals and over 200 calories")
+    assert (parsed.min_calories, parsed.max_calories) == (200, 400)
+    assert parse_query("Greek yogurt under 200 calories").max_calories == 200
+    assert parse_query("low calorie soup").max_calories == LOW_CALORIE_MAX
+
+
+def test_filters_only_query_keeps_the_original_text():
+    query = "under 400 cals and over 200 calories"
+    assert parse_query(query).text == query
+
+
+def test_retrieval_text():
+    assert retrieval_text("Thai curry.") == "Thai curry."
+    assert retrieval_text("Thai curry under 500 calories") == "Thai curry"
@@ -0,0 +1,62 @@
+import re
+
+import pytest
+
+from modules import response_cache as response_cache_module
+from modules.query_cache import embed_queries, query_embedding_cache
+from modules.query_parser import retrieval_text
+from modules.response_cache import SemanticResponseCache, response_cache_key
+
+VOCABULARY = ("spicy", "thai", "curry", "chocolate", "cake", "pasta")
+RESULTS = [{"food_id": "12"}, {"food_id": "7"}, {"food_id": "31"}]
+
+
+class BagOfWordsEmbedding:
+    """Word-count vectors over a tiny vocabulary, recording every encoder call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(re.findall(r"[a-z]+", text.lower()).count(word)) for word in VOCABULARY]
+                for text in texts]
+
+
+@pytest.fixture
+def embedding_function(monkeypatch):
+    encoder = BagOfWordsEmbedding()
+    monkeypatch.setattr(response_cache_module, "get_embedding_function", lambda: encoder)
+    query_embedding_cache.clear()
+    yield encoder
+    query_embedding_cache.clear()
+
+
+@pytest.mark.parametrize("query", ["spicy thai curry", "spicy curry under 400 calories"])
+def test_key_reuses_the_retrieval_embedding(embedding_function, query):
+    embed_queries([retrieval_text(query)], embedding_function)  # what retrieval encodes
+    response_cache_key(query, RESULTS)
+    assert len(embedding_function.calls) == 1
+
+
+def test_repeated_and_paraphrased_queries_hit(embedding_function):
+    cache = SemanticResponseCache(threshold=0.95)
+    embedding, food_ids, filters = response_cache_key("Spicy Thai curry", RESULTS)
+    cache.store(embedding, food_ids, "model", "Try the green curry.", filters)
+
+    for query in ("Spicy Thai curry", "curry, thai and spicy"):
+        embedding, food_ids, filters = response_cache_key(query, RESULTS)
+        assert cache.lookup(embedding, food_ids, "model", filters) == "Try the green curry."
+    assert cache.stats()["hits"] == 2
+    assert len(embedding_function.calls) == 2
+
+
+def test_other_filters_or_foods_miss(embedding_function):
+    cache = SemanticResponseCache(threshold=0.95)
+    embedding, food_ids, filters = response_cache_key("spicy curry under 400 calories", RESULTS)
+    cache.store(embedding, food_ids, "model", "Try the green curry.", filters)
+
+    embedding, food_ids, filters = response_cache_key("spicy curry under 600 calories", RESULTS)
+    assert cache.lookup(embedding, food_ids, "model", filters) is None
+    embedding, food_ids, filters = response_cache_key("spicy curry under 400 calories", RESULTS[1:])
+    assert cache.lookup(embedding, food_ids, "model", filters) is None
@@ -0,0 +1,52 @@
+import hashlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from modules.create_chroma import sync_food_collection  # noqa: E402
+from modules.faiss_backend import FaissCollection  # noqa: E402
+from modules.load_food_data import iter_similarity_records  # noqa: E402
+
+FOODS = [
+    {"food_id": 1, "food_name": "Pad Thai", "cuisine_type": "Thai", "food_calories_per_serving": 450},
+    {"food_id": 2, "food_name": "Lasagna", "cuisine_type": "Italian", "food_calories_per_serving": 600},
+    {"food_id": 3, "food_name": "Miso Soup", "cuisine_type": "Japanese", "food_calories_per_serving": 90},
+]
+
+
+class HashEmbedding:
+    """Deterministic 8-dimensional vectors derived from the text, recording every encoded text"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        return [np.frombuffer(hashlib.sha256(text.encode()).digest()[:8], dtype=np.uint8).astype(np.float32) + 1
+                for text in texts]
+
+
+def test_sync_upserts_changed_deletes_removed_and_skips_unchanged():
+    collection = FaissCollection("foods", index_type="flat")
+    encoder = HashEmbedding()
+    stats = sync_food_collection(collection, iter_similarity_records(FOODS), embedding_function=encoder)
+    assert stats == {"upserted": 3, "deleted": 0, "unchanged": 0}
+
+    updated = [
+        FOODS[0],
+        dict(FOODS[1], food_description="Baked with extra ricotta"),
+        {"food_id": 4, "food_name": "Tacos", "cuisine_type": "Mexican", "food_calories_per_serving": 350},
+    ]
+    encoder.encoded.clear()
+    stats = sync_food_collection(collection, iter_similarity_records(updated), embedding_function=encoder)
+
+    assert stats == {"upserted": 2, "deleted": 1, "unchanged": 1}
+    assert sorted(collection.get()["ids"]) == ["1", "2", "4"]
+    assert collection.count() == 3
+    assert [text.split(".")[0] for text in encoder.encoded] == ["Name: Lasagna", "Name: Tacos"]
+    assert collection.get(ids=["2"])["metadatas"][0]["description"] == "Baked with extra ricotta"
+
+    stats = sync_food_collection(collection, iter_similarity_records(updated), embedding_function=encoder)
+    assert stats == {"upserted": 0, "deleted": 0, "unchanged": 3}
@@ -1,8 +1,13 @@
+import sys
+
 from modules.embeddings_model import call_retriever
 
 def main():
-    result = call_retriever("email policy", k=5)
-    print(result)
+    # The retriever is built on the first call and reused for every query after it
+    queries = sys.argv[1:] or ["email policy"]
+    for query in queries:
+        result = call_retriever(query, k=5)
+        print(result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+"""On-disk embedding cache, shared with food_search and chromadb_example
+
+The implementation lives in food_search/src/modules/embedding_cache.py; this
+module wraps it as a LangChain ``Embeddings`` so the three projects keep one
+cache per model instead of a separate LocalFileStore here.
+"""
+import os
+import sys
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from food_search.src.modules.embedding_cache import CachedEmbeddingFunction  # noqa: E402
+
+# The other projects name sentence-transformers models without their hub prefix
+_HUB_PREFIX = "sentence-transformers/"
+
+
+def cache_model_name(model_name: str) -> str:
+    """Model name the shared cache is keyed by"""
+    return model_name[len(_HUB_PREFIX):] if model_name.startswith(_HUB_PREFIX) else model_name
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings whose document vectors are read from and written to the shared cache
+
+    Queries are encoded directly, so one-off questions never enter the cache.
+    """
+
+    def __init__(self, underlying_embeddings: Embeddings, model_name: str, cache_dir: str | None = None):
+        self.underlying_embeddings = underlying_embeddings
+        self._cached = CachedEmbeddingFunction(underlying_embeddings.embed_documents,
+                                               cache_model_name(model_name), cache_dir=cache_dir)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [embedding.tolist() for embedding in self._cached(texts)]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying_embeddings.embed_query(text)
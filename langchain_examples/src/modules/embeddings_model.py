@@ -1,12 +1,11 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import functools
+import hashlib
 import os
-from langchain_chroma import Chroma
-from langchain_community.document_loaders import TextLoader, PyPDFLoader
-from .splliter import text_splitter
-from langchain.retrievers.multi_query import MultiQueryRetriever
-from .llm_model import llm_model_langchain
 import logging
-from PyPDF2 import PdfReader
+import threading
+from .ingest import DEFAULT_INDEX_BATCH_SIZE, index_documents, iter_chunks, iter_pdf_pages, iter_text_blocks
+# langchain, HuggingFace, Chroma and the PDF loader are imported inside the
+# functions that need them so importing this module stays cheap.
 logging.basicConfig()
 logging.getLogger("langchain.retrievers.multi_query").setLevel(logging.INFO)
 
@@ -15,47 +14,165 @@ root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if "TOKENIZERS_PARALLELISM" not in os.environ:
     os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-def embeddings_model(model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
-    return HuggingFaceEmbeddings(model_name=model_name)
-    
-## Text Document Retriever
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
-def text_document_retriever(k: int = 5):
-    print(f"root_path: {root_path}")
-    documents = TextLoader(os.path.join(root_path, "companypolicies.txt")).load()
+def embeddings_model(model_name: str = DEFAULT_EMBEDDING_MODEL, use_cache: bool = True):
+    """HuggingFace embeddings, backed by the on-disk cache shared with food_search (EMBEDDING_CACHE_DIR)"""
+    from langchain_huggingface import HuggingFaceEmbeddings
 
-    documents = text_splitter(documents, chunk_size=2000, chunk_overlap=100)
-    vectordb = Chroma.from_documents(documents, embeddings_model())
-    retriever = vectordb.as_retriever(search_kwargs={"k": k})
-    
-    if not documents:
-        raise ValueError("No pages were loaded from the PDF")
+    embeddings = HuggingFaceEmbeddings(model_name=model_name)
+    if not use_cache:
+        return embeddings
+    from .embedding_cache import CachedEmbeddings
 
+    return CachedEmbeddings(embeddings, model_name)
 
-    return retriever
 
+@functools.lru_cache(maxsize=None)
+def get_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL, use_cache: bool = True):
+    """Embeddings model shared by every retriever, loaded once per process"""
+    return embeddings_model(model_name, use_cache)
 
-## PDF Document Retriever and MultiQueryRetriever
-def pdf_document_retriever(k: int = 5):
-    print(f"root_path: {root_path}")
-    documents = PyPDFLoader(os.path.join(root_path, "langchain-paper.pdf")).load()
+## Retriever service
+# Loading, splitting and embedding a source document is expensive, so each
+# source is indexed once per process (or once per persist directory) and the
+# resulting vector store is reused for every query.
+
+class RetrieverService:
+    """Long-lived vector store over one source document
+
+    With ``persist_directory`` set (or CHROMA_PERSIST_DIR in the environment)
+    the index is written to ``<persist_directory>/<name>-<fingerprint>`` and reopened
+    on later runs; the fingerprint covers the file contents, chunking and
+    embedding model, so an edited source is re-indexed automatically.
+    """
+
+    def __init__(self, file_name: str, loader: str = "text", chunk_size: int = 500,
+                 chunk_overlap: int = 20, persist_directory: str | None = None,
+                 model_name: str = DEFAULT_EMBEDDING_MODEL, workers: int | None = None,
+                 batch_size: int = DEFAULT_INDEX_BATCH_SIZE):
+        self.file_path = os.path.join(root_path, file_name)
+        self.loader = loader
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.persist_directory = persist_directory or os.getenv("CHROMA_PERSIST_DIR")
+        self.model_name = model_name
+        self.workers = workers
+        self.batch_size = batch_size
+        self._vectordb = None
+        self._llm = None
+        self._multi_query_retrievers = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.file_path, "rb") as source:
+            for block in iter(lambda: source.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(f"{self.loader}:{self.chunk_size}:{self.chunk_overlap}:{self.model_name}".encode())
+        return digest.hexdigest()[:16]
+
+    def iter_chunks(self):
+        """Stream chunks of the source: PDF pages are parsed in a process pool"""
+        if self.loader == "pdf":
+            documents = iter_pdf_pages(self.file_path, workers=self.workers)
+        else:
+            documents = iter_text_blocks(self.file_path)
+        return iter_chunks(documents, self.chunk_size, self.chunk_overlap)
+
+    def _index(self, vectordb):
+        if not index_documents(vectordb, self.iter_chunks(), self.batch_size):
+            raise ValueError(f"No pages were loaded from {self.file_path}")
+        return vectordb
+
+    def _build_vectordb(self):
+        from langchain_chroma import Chroma
+
+        collection_name = os.path.splitext(os.path.basename(self.file_path))[0]
+        embeddings = get_embeddings(self.model_name)
+        if not self.persist_directory:
+            print(f"📥 Indexing {self.file_path} (in memory)")
+            return self._index(Chroma(collection_name=collection_name, embedding_function=embeddings))
+
+        directory = os.path.join(self.persist_directory, f"{collection_name}-{self.fingerprint()}")
+        complete_marker = os.path.join(directory, ".complete")
+        vectordb = Chroma(collection_name=collection_name, embedding_function=embeddings,
+                          persist_directory=directory)
+        if os.path.exists(complete_marker):
+            print(f"📂 Reusing persisted index at {directory}")
+            return vectordb
+
+        # Batches land on disk as they are indexed, so an interrupted run leaves
+        # a partial collection behind; start it over rather than reuse it.
+        if vectordb._collection.count():
+            vectordb.delete_collection()
+            vectordb = Chroma(collection_name=collection_name, embedding_function=embeddings,
+                              persist_directory=directory)
+
+        print(f"📥 Indexing {self.file_path} into {directory}")
+        self._index(vectordb)
+        open(complete_marker, "w").close()
+        return vectordb
 
-    documents = text_splitter(documents, chunk_size=500, chunk_overlap=20)
-    vectordb = Chroma.from_documents(documents, embeddings_model())
-    retriever = MultiQueryRetriever.from_llm(
-    retriever=vectordb.as_retriever(), llm=llm_model_langchain()
-)
-    
-    if not documents:
-        raise ValueError("No pages were loaded from the PDF")
+    @property
+    def vectordb(self):
+        with self._lock:
+            if self._vectordb is None:
+                self._vectordb = self._build_vectordb()
+            return self._vectordb
 
+    def retriever(self, k: int = 5, **search_kwargs):
+        return self.vectordb.as_retriever(search_kwargs={"k": k, **search_kwargs})
 
-    return retriever
+    def multi_query_retriever(self, k: int = 4):
+        """Multi-query retriever over the shared store; the LLM client is built once
 
+        Paraphrases are cached per question and the sub-queries are embedded in
+        one batch and searched concurrently (see modules.multi_query).
+        """
+        from .llm_model import llm_model_langchain
+        from .multi_query import CachedMultiQueryRetriever
+
+        vectordb = self.vectordb
+        with self._lock:
+            if k not in self._multi_query_retrievers:
+                if self._llm is None:
+                    self._llm = llm_model_langchain()
+                self._multi_query_retrievers[k] = CachedMultiQueryRetriever.from_vectorstore(vectordb, self._llm, k=k)
+            return self._multi_query_retrievers[k]
+
+    def invoke(self, query: str, k: int = 5, multi_query: bool = False):
+        if multi_query:
+            return self.multi_query_retriever(k).invoke(query)
+        return self.retriever(k).invoke(query)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_retriever_service(file_name: str, **options) -> RetrieverService:
+    """Process-wide RetrieverService per source file and options"""
+    key = (file_name, tuple(sorted(options.items())))
+    with _services_lock:
+        if key not in _services:
+            _services[key] = RetrieverService(file_name, **options)
+        return _services[key]
+
+
+## Text Document Retriever
+
+def text_document_retriever(k: int = 5):
+    service = get_retriever_service("companypolicies.txt", chunk_size=2000, chunk_overlap=100)
+    return service.retriever(k)
+
+
+## PDF Document Retriever and MultiQueryRetriever
+def pdf_document_retriever(k: int = 5):
+    service = get_retriever_service("langchain-paper.pdf", loader="pdf", chunk_size=500, chunk_overlap=20)
+    return service.multi_query_retriever(k)
 
-    
 
 def call_retriever(query, k: int = 5):
     retriever = pdf_document_retriever(k)
     return retriever.invoke(query)
-    
\ No newline at end of file
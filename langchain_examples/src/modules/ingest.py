@@ -0,0 +1,104 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+# pypdf and langchain are imported inside the functions that need them so
+# importing this module stays cheap.
+
+DEFAULT_PAGES_PER_TASK = 16
+DEFAULT_INDEX_BATCH_SIZE = 256
+DEFAULT_TEXT_BLOCK_CHARS = 1 << 20
+
+
+def _extract_pages(file_path: str, start: int, stop: int):
+    """Worker: text of pages ``start``..``stop`` of one PDF"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    return [(number, reader.pages[number].extract_text()) for number in range(start, stop)]
+
+
+def count_pdf_pages(file_path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(file_path).pages)
+
+
+def iter_pdf_pages(file_path: str, workers: int | None = None, pages_per_task: int = DEFAULT_PAGES_PER_TASK):
+    """Yield one Document per PDF page, in page order, parsed in a process pool
+
+    At most ``2 * workers`` page ranges are in flight, so memory stays bounded
+    by the window rather than by the size of the PDF. Metadata matches
+    PyPDFLoader (``source`` and zero-based ``page``).
+    """
+    from langchain_core.documents import Document
+
+    total_pages = count_pdf_pages(file_path)
+    workers = workers or os.cpu_count() or 1
+    ranges = ((start, min(start + pages_per_task, total_pages)) for start in range(0, total_pages, pages_per_task))
+
+    def documents(pages):
+        for number, text in pages:
+            yield Document(page_content=text, metadata={"source": file_path, "page": number})
+
+    if workers == 1:
+        for start, stop in ranges:
+            yield from documents(_extract_pages(file_path, start, stop))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(_extract_pages, file_path, start, stop)
+                        for start, stop in islice(ranges, 2 * workers))
+        while pending:
+            pages = pending.popleft().result()
+            next_range = next(ranges, None)
+            if next_range is not None:
+                pending.append(executor.submit(_extract_pages, file_path, *next_range))
+            yield from documents(pages)
+
+
+def iter_text_blocks(file_path: str, block_chars: int = DEFAULT_TEXT_BLOCK_CHARS):
+    """Yield a text file as Documents of roughly ``block_chars``, split on line boundaries"""
+    from langchain_core.documents import Document
+
+    with open(file_path, encoding="utf-8") as source:
+        lines, size = [], 0
+        for line in source:
+            lines.append(line)
+            size += len(line)
+            if size >= block_chars:
+                yield Document(page_content="".join(lines), metadata={"source": file_path})
+                lines, size = [], 0
+        if lines:
+            yield Document(page_content="".join(lines), metadata={"source": file_path})
+
+
+def iter_chunks(documents, chunk_size: int, chunk_overlap: int):
+    """Split a stream of Documents one at a time with RecursiveCharacterTextSplitter"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+    )
+    for document in documents:
+        yield from splitter.split_documents([document])
+
+
+def index_documents(vectordb, chunks, batch_size: int = DEFAULT_INDEX_BATCH_SIZE) -> int:
+    """Embed and add chunks to a vector store in fixed-size batches, reporting throughput"""
+    started = time.perf_counter()
+    total = 0
+    chunks = iter(chunks)
+    while batch := list(islice(chunks, batch_size)):
+        vectordb.add_documents(batch)
+        total += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"   indexed {total} chunks ({total / elapsed:.1f} chunks/sec)", end="\r", flush=True)
+
+    elapsed = time.perf_counter() - started
+    if total:
+        print(f"✅ Indexed {total} chunks in {elapsed:.2f}s ({total / elapsed:.1f} chunks/sec)")
+    return total
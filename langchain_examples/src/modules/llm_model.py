@@ -1,12 +1,26 @@
 # Initialize Anthropic client
 import os
+import sys
 from dotenv import load_dotenv
-from anthropic import Anthropic
-from langchain_anthropic import ChatAnthropic
 
+# Loaded before llm_client is imported so this project's .env sets LLM_MODEL and the pool settings
 load_dotenv()
 
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+# The pooled Anthropic client, with its connection, timeout and retry settings,
+# lives in food_search/src/modules/llm_client.py and is shared by both projects
+from food_search.src.modules.llm_client import (  # noqa: E402
+    LLM_MAX_RETRIES, LLM_TIMEOUT, MODEL, generate_response, get_llm_client as get_llm_model,
+)
+
+__all__ = ["MODEL", "generate_response", "get_llm_model", "llm_model_langchain"]
+
+
 def llm_model_langchain(params=None):
+    from langchain_anthropic import ChatAnthropic
 
     load_dotenv()
     params = params or {}
@@ -15,7 +29,7 @@ def llm_model_langchain(params=None):
     if not api_key:
         raise ValueError("Please set the ANTHROPIC_API_KEY in your .env file")
 
-    model = params.get("model", "claude-3-haiku-20240307")
+    model = params.get("model", MODEL)
     max_tokens = params.get("max_tokens", 400)
     temperature = params.get("temperature", 0.7)
 
@@ -25,24 +39,8 @@ def llm_model_langchain(params=None):
         model=model,
         max_tokens=max_tokens,
         temperature=temperature,
+        max_retries=params.get("max_retries", LLM_MAX_RETRIES),
+        default_request_timeout=params.get("timeout", LLM_TIMEOUT),
     )
 
     return llm
-
-
-def get_llm_model():
-    """Get the LLM model"""
-    client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-    MODEL = os.getenv("LLM_MODEL", "claude-3-haiku-20240307")
-    return client
-
-
-def generate_response(prompt: str) -> str:
-    """Generate response using LLM model"""
-    client = get_llm_model()
-    message = client.messages.create(
-        model=MODEL,
-        max_tokens=1000,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return message.content[0].text
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from langchain.retrievers.multi_query import DEFAULT_QUERY_PROMPT, LineListOutputParser, MultiQueryRetriever
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from .ttl_cache import TTLCache
+
+
+class ParaphraseCache(TTLCache):
+    """LRU cache of LLM-generated paraphrases keyed by the normalized question"""
+
+    def __init__(self, maxsize: int = 512, ttl: Optional[float] = 3600):
+        super().__init__(maxsize, ttl)
+
+    @staticmethod
+    def key(question: str) -> str:
+        return " ".join(question.lower().split())
+
+    def get(self, question: str) -> Optional[List[str]]:
+        queries = super().get(self.key(question))
+        return list(queries) if queries is not None else None
+
+    def set(self, question: str, queries: List[str]) -> None:
+        super().set(self.key(question), list(queries))
+
+
+paraphrase_cache = ParaphraseCache(
+    maxsize=int(os.getenv("PARAPHRASE_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("PARAPHRASE_CACHE_TTL", "3600")),
+)
+
+
+class CachedMultiQueryRetriever(MultiQueryRetriever):
+    """MultiQueryRetriever with cached paraphrases and concurrent sub-query search
+
+    Paraphrases come from ``paraphrase_cache`` when the same question was asked
+    before. All sub-queries are embedded in one batch and searched in parallel
+    against the vector store, so a query costs about one retrieval plus (at most)
+    one LLM call. ``ainvoke`` goes through the same cache and batched search,
+    with the blocking search run in a worker thread.
+    """
+
+    vectorstore: VectorStore
+    k: int = 4
+    max_workers: int = 4
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore: VectorStore, llm, k: int = 4, prompt=DEFAULT_QUERY_PROMPT,
+                         include_original: bool = False, max_workers: int = 4) -> "CachedMultiQueryRetriever":
+        llm_chain = prompt | llm | LineListOutputParser()
+        return cls(
+            retriever=vectorstore.as_retriever(search_kwargs={"k": k}),
+            llm_chain=llm_chain,
+            include_original=include_original,
+            vectorstore=vectorstore,
+            k=k,
+            max_workers=max_workers,
+        )
+
+    def generate_queries(self, question: str, run_manager: CallbackManagerForRetrieverRun) -> List[str]:
+        queries = paraphrase_cache.get(question)
+        if queries is None:
+            queries = [query for query in super().generate_queries(question, run_manager) if query.strip()]
+            paraphrase_cache.set(question, queries)
+        return queries
+
+    async def agenerate_queries(self, question: str, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[str]:
+        queries = paraphrase_cache.get(question)
+        if queries is None:
+            queries = [query for query in await super().agenerate_queries(question, run_manager) if query.strip()]
+            paraphrase_cache.set(question, queries)
+        return queries
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        # CachedEmbeddings.embed_documents would store every one-off
+        # paraphrase in the persistent document cache, so the sub-queries are
+        # batch-encoded with the wrapped model instead.
+        embeddings = self.vectorstore.embeddings
+        return getattr(embeddings, "underlying_embeddings", embeddings).embed_documents(queries)
+
+    def _search(self, queries: List[str]) -> List[Document]:
+        if not queries:
+            return []
+        embeddings = self._embed_queries(queries)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(queries))) as executor:
+            results = executor.map(
+                lambda embedding: self.vectorstore.similarity_search_by_vector(embedding, k=self.k), embeddings
+            )
+            return [document for documents in results for document in documents]
+
+    def retrieve_documents(self, queries: List[str], run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self._search(queries)
+
+    async def aretrieve_documents(self, queries: List[str],
+                                  run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        return await asyncio.to_thread(self._search, queries)
@@ -1,11 +1,15 @@
+import functools
+
 from langchain_core.documents import Document
 from langchain.chains.query_constructor.base import AttributeInfo
-from langchain.retrievers.self_query.base import SelfQueryRetriever
 from langchain_chroma import Chroma
-from modules.embeddings_model import embeddings_model
+from modules.embeddings_model import get_embeddings
 from modules.llm_model import llm_model_langchain
+from modules.self_query_cache import CachedSelfQueryRetriever
 
+@functools.lru_cache(maxsize=None)
 def self_querying_retriever():
+    """Built once per process; filter translations are cached by the retriever"""
     docs = [
         Document(
             page_content="A bunch of scientists bring back dinosaurs and mayhem breaks loose",
@@ -58,8 +62,8 @@ def self_querying_retriever():
         ),
     ]
     document_content_description = "Brief summary of a movie."
-    vectordb = Chroma.from_documents(docs, embeddings_model())
-    retriever = SelfQueryRetriever.from_llm(
+    vectordb = Chroma.from_documents(docs, get_embeddings())
+    retriever = CachedSelfQueryRetriever.from_llm(
         llm=llm_model_langchain(),
         vectorstore=vectordb,
         metadata_field_info=metadata_field_info,
@@ -73,4 +77,8 @@ def call_retriever(query):
 
 
 if __name__ == "__main__":
-    print(call_retriever("What is the rating of the movie Inception?"))
\ No newline at end of file
+    print(call_retriever("What is the rating of the movie Inception?"))
+    # Same shape with different numbers: answered from the cached template, no LLM call
+    print(call_retriever("Movies rated above 8.5 released after 2000"))
+    print(call_retriever("Movies rated above 7 released after 1990"))
+    print(self_querying_retriever().translation_cache.stats())
\ No newline at end of file
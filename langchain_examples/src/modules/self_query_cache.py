@@ -0,0 +1,199 @@
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+from langchain.retrievers.self_query.base import SelfQueryRetriever
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.pydantic_v1 import Field
+from langchain_core.structured_query import Comparison, Operation, StructuredQuery
+
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Standalone numbers only: "rated above 8.5" has one, "the 90s" has none
+NUMBER_PATTERN = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?![\w.])")
+
+
+@dataclass(frozen=True)
+class NumberSlot:
+    """Placeholder for the ``index``-th number of the query inside a cached template"""
+    index: int
+    kind: type
+
+
+@dataclass(frozen=True)
+class QueryTemplate:
+    """StructuredQuery whose numeric values may be NumberSlots"""
+    query: str
+    filter: Any
+    limit: Any
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def query_template(query: str) -> Tuple[str, List[str]]:
+    """``"movies rated above 8.5"`` -> ``("movies rated above <n>", ["8.5"])``"""
+    normalized = normalize_query(query)
+    return NUMBER_PATTERN.sub("<n>", normalized), NUMBER_PATTERN.findall(normalized)
+
+
+def _map_filter(node, transform: Callable[[Any], Any]):
+    if node is None:
+        return None
+    if isinstance(node, Operation):
+        return Operation(operator=node.operator, arguments=[_map_filter(arg, transform) for arg in node.arguments])
+    return Comparison(comparator=node.comparator, attribute=node.attribute, value=transform(node.value))
+
+
+def templatize(structured_query: StructuredQuery, numbers: List[str]) -> Optional[QueryTemplate]:
+    """Replace values taken from the query's numbers with NumberSlots
+
+    Returns None when the translation can't be safely reused for other numbers:
+    a number matches more than one position, or a number of the query does not
+    appear verbatim in the translation (e.g. "last 5 years" -> year >= 2020).
+    """
+    used = set()
+    ambiguous = False
+
+    def slot_for(value):
+        nonlocal ambiguous
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return value
+        matches = [i for i, number in enumerate(numbers) if float(number) == float(value)]
+        if len(matches) > 1:
+            ambiguous = True
+        if len(matches) != 1:
+            return value
+        used.add(matches[0])
+        return NumberSlot(matches[0], type(value))
+
+    def slot_text(match):
+        number = match.group(0)
+        matches = [i for i, candidate in enumerate(numbers) if float(candidate) == float(number)]
+        if len(matches) != 1:
+            return number
+        used.add(matches[0])
+        return "{%d}" % matches[0]
+
+    query_text = NUMBER_PATTERN.sub(slot_text, structured_query.query.replace("{", "{{").replace("}", "}}"))
+    template = QueryTemplate(
+        query=query_text,
+        filter=_map_filter(structured_query.filter, slot_for),
+        limit=slot_for(structured_query.limit),
+    )
+    if ambiguous or used != set(range(len(numbers))):
+        return None
+    return template
+
+
+def instantiate(template: QueryTemplate, numbers: List[str]) -> StructuredQuery:
+    def fill(value):
+        if not isinstance(value, NumberSlot):
+            return value
+        number = numbers[value.index]
+        return int(number) if value.kind is int and number.isdigit() else float(number)
+
+    return StructuredQuery(
+        query=template.query.format(*numbers),
+        filter=_map_filter(template.filter, fill),
+        limit=fill(template.limit),
+    )
+
+
+class QueryTranslationCache:
+    """LRU cache of query -> StructuredQuery, with reuse across queries that differ only in numbers
+
+    Exact (normalized) queries are looked up first; otherwise a template such as
+    ``"movies rated above <n>"`` learnt from an earlier translation is filled in
+    with the new query's numbers.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._exact = TTLCache(maxsize)
+        self._templates = TTLCache(maxsize)
+
+    # A template is only looked up after an exact miss, so the two caches'
+    # counters split every lookup three ways
+    @property
+    def hits(self) -> int:
+        return self._exact.hits
+
+    @property
+    def template_hits(self) -> int:
+        return self._templates.hits
+
+    @property
+    def misses(self) -> int:
+        return self._templates.misses
+
+    def get(self, query: str) -> Optional[StructuredQuery]:
+        template_key, numbers = query_template(query)
+        exact = self._exact.get(normalize_query(query))
+        if exact is not None:
+            return exact
+        template = self._templates.get(template_key)
+        if template is not None:
+            return instantiate(template, numbers)
+        return None
+
+    def set(self, query: str, structured_query: StructuredQuery) -> None:
+        template_key, numbers = query_template(query)
+        template = templatize(structured_query, numbers)
+        self._exact.set(normalize_query(query), structured_query)
+        if template is not None:
+            self._templates.set(template_key, template)
+
+    def clear(self) -> None:
+        self._exact.clear()
+        self._templates.clear()
+
+    def stats(self):
+        total = self.hits + self.template_hits + self.misses
+        return {
+            "exact_entries": len(self._exact),
+            "templates": len(self._templates),
+            "hits": self.hits,
+            "template_hits": self.template_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.template_hits) / total if total else 0.0,
+        }
+
+
+class CachedSelfQueryRetriever(SelfQueryRetriever):
+    """SelfQueryRetriever that only calls the LLM for query shapes it has not translated yet"""
+
+    translation_cache: QueryTranslationCache = Field(
+        default_factory=lambda: QueryTranslationCache(int(os.getenv("SELF_QUERY_CACHE_SIZE", "1024")))
+    )
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        structured_query = self.translation_cache.get(query)
+        if structured_query is None:
+            structured_query = self.query_constructor.invoke(
+                {"query": query}, config={"callbacks": run_manager.get_child()}
+            )
+            self.translation_cache.set(query, structured_query)
+        if self.verbose:
+            logger.info(f"Generated Query: {structured_query}")
+        new_query, search_kwargs = self._prepare_query(query, structured_query)
+        return self._get_docs_with_query(new_query, search_kwargs)
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        structured_query = self.translation_cache.get(query)
+        if structured_query is None:
+            structured_query = await self.query_constructor.ainvoke(
+                {"query": query}, config={"callbacks": run_manager.get_child()}
+            )
+            self.translation_cache.set(query, structured_query)
+        if self.verbose:
+            logger.info(f"Generated Query: {structured_query}")
+        new_query, search_kwargs = self._prepare_query(query, structured_query)
+        return await self._aget_docs_with_query(new_query, search_kwargs)
@@ -0,0 +1,15 @@
+"""Size-bounded LRU cache with optional expiry, shared with food_search
+
+The implementation is food_search's ``TTLCache`` (food_search/src/modules/query_cache.py);
+the paraphrase and query translation caches here are built on it.
+"""
+import os
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from food_search.src.modules.query_cache import TTLCache  # noqa: E402
+
+__all__ = ["TTLCache"]